@@ -4,6 +4,7 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_socketio import SocketIO
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
 
 db = SQLAlchemy()
@@ -15,26 +16,46 @@ def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    if Config.PROXY_FIX_X_FOR:
+        # request.remote_addr becomes the client's address, e.g. for the login throttle
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.PROXY_FIX_X_FOR)
+
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
 
     CORS(app, resources={r"/*": {"origins": ["http://localhost:5173", "http://127.0.0.1:5173"]}})
-    socketio.init_app(app, cors_allowed_origins=["http://localhost:5173", "http://127.0.0.1:5173"])
-
-    from app.models import user, appointment, service, vehicle, availability
+    socketio.init_app(
+        app,
+        cors_allowed_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
+        message_queue=Config.SOCKETIO_MESSAGE_QUEUE,
+        async_mode=Config.SOCKETIO_ASYNC_MODE
+    )
+
+    from app.models import user, appointment, service, vehicle, availability, schedule_version, notification_outbox, revoked_token
     from app.views.auth_view import auth_bp
     from app.views.service_view import service_bp
     from app.views.appointment_view import appointment_bp
     from app.views.provider_view import provider_bp
     from app.views.vehicle_view import vehicle_bp
+    from app.views.instrumentation_view import instrumentation_bp
 
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(service_bp, url_prefix='/services')
     app.register_blueprint(appointment_bp, url_prefix='/appointments')
     app.register_blueprint(provider_bp, url_prefix='/providers')
     app.register_blueprint(vehicle_bp, url_prefix='/vehicles')
+    app.register_blueprint(instrumentation_bp, url_prefix='/instrumentation')
+
+    from app.utils.circuit_breaker import start_request_budget
+    app.before_request(start_request_budget)
+
+    from app.utils.revocation import is_token_revoked
+    jwt.token_in_blocklist_loader(is_token_revoked)
 
     from app.sockets import events
 
+    from app.cli import register_commands
+    register_commands(app)
+
     return app
@@ -0,0 +1,96 @@
+import time
+import click
+from flask.cli import AppGroup
+from config import Config
+
+notifications_cli = AppGroup('notifications', help='Notification delivery commands.')
+auth_cli = AppGroup('auth', help='Authentication maintenance commands.')
+
+
+@notifications_cli.command('dispatch')
+@click.option('--once', is_flag=True, help='Drain the due notifications once and exit.')
+@click.option('--batch-size', type=int, default=None, help='Rows claimed per batch.')
+def dispatch_notifications(once, batch_size):
+    """Deliver queued notifications from the outbox."""
+    from app.utils.outbox import dispatch_pending
+
+    while True:
+        sent, failed, deferred = dispatch_pending(batch_size)
+        if sent or failed or deferred:
+            click.echo(f'Dispatched {sent} notifications, {failed} failed, {deferred} deferred')
+
+        # Keep draining while batches come back full, unless nothing could be
+        # attempted because the transports' circuits are open
+        if sent + failed and sent + failed + deferred >= (batch_size or Config.OUTBOX_BATCH_SIZE):
+            continue
+        if once:
+            break
+        time.sleep(Config.OUTBOX_POLL_INTERVAL_SECONDS)
+
+
+@notifications_cli.command('remind')
+@click.option('--hours', type=int, default=None, help='Remind appointments starting within this many hours.')
+@click.option('--once', is_flag=True, help='Send the due reminders once and exit.')
+@click.option('--batch-size', type=int, default=None, help='Appointments claimed per batch.')
+def send_reminders(hours, once, batch_size):
+    """Send reminders for upcoming appointments."""
+    from app.utils.reminders import send_due_reminders
+
+    while True:
+        claimed, emails_sent, sms_sent = send_due_reminders(hours, batch_size)
+        if claimed:
+            click.echo(f'Reminded {claimed} appointments: {emails_sent} emails, {sms_sent} SMS')
+
+        # Keep going while full batches reach customers. Undelivered
+        # reminders are released, so a full batch that reached nobody (e.g.
+        # the transports are down) would only be claimed again.
+        if claimed >= (batch_size or Config.REMINDER_BATCH_SIZE) and emails_sent + sms_sent:
+            continue
+        if once:
+            break
+        time.sleep(Config.REMINDER_POLL_INTERVAL_SECONDS)
+
+
+@auth_cli.command('purge-revoked')
+def purge_revoked_tokens():
+    """Delete revoked-token rows whose tokens have expired."""
+    from app.utils.revocation import purge_expired_revocations
+
+    removed = purge_expired_revocations()
+    click.echo(f'Purged {removed} expired token revocations')
+
+
+@auth_cli.command('import-users')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'data_format', type=click.Choice(['csv', 'json']), default=None,
+              help='File format; taken from the file extension by default.')
+def import_users(path, data_format):
+    """Create users in bulk from a CSV or JSON file."""
+    from app.controllers.auth_controller import AuthController
+    from app.utils.user_import import parse_user_rows
+
+    data_format = data_format or ('json' if path.lower().endswith('.json') else 'csv')
+    with open(path, encoding='utf-8-sig') as f:
+        try:
+            rows = parse_user_rows(f.read(), data_format)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    imported = failed = 0
+    # Large files go in chunks, each its own transaction
+    for offset in range(0, len(rows), Config.USER_IMPORT_MAX_ROWS):
+        result, status_code = AuthController.import_users(rows[offset:offset + Config.USER_IMPORT_MAX_ROWS])
+        if status_code != 200:
+            raise click.ClickException(f"{result['error']} (rows {offset}+; {imported} imported before)")
+        imported += result['imported']
+        failed += result['failed']
+        for error in result['errors']:
+            click.echo(f"Row {offset + error['row'] + 1}: {error['email']}: {error['error']}", err=True)
+
+    click.echo(f'Imported {imported} users, {failed} rows failed')
+
+
+def register_commands(app):
+    """Register the flask CLI command groups"""
+    app.cli.add_command(notifications_cli)
+    app.cli.add_command(auth_cli)
\ No newline at end of file
@@ -3,10 +3,28 @@ from app.models.appointment import Appointment
 from app.models.service import Service
 from app.models.vehicle import Vehicle
 from app.models.user import User
+import csv
+import io
+import json
+from contextlib import ExitStack
 from datetime import datetime, timedelta
-from app.utils.validators import validate_time_slot
-from app.utils.notifications import send_appointment_confirmation
-from sqlalchemy import and_, or_
+from decimal import Decimal
+from app.utils.validators import validate_time_slot, is_business_day
+from app.utils.outbox import enqueue_notification
+from app.utils.slots import DayOccupancy, MINUTES_PER_DAY, peak_concurrency
+from app.utils.availability_templates import get_open_intervals, warm_provider_templates
+from app.utils.locks import provider_day_lock
+from app.utils.conflict_index import find_cached_conflict, get_schedule_version, lane_for, ScheduleChange
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.load_profiles import with_load_profile
+from app.sockets.events import (
+    notify_new_appointment,
+    notify_appointment_cancelled,
+    notify_appointment_status,
+    broadcast_slot_update
+)
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.exc import IntegrityError
 from config import Config
 
 
@@ -50,55 +68,264 @@ class AppointmentController:
             if not slot_valid:
                 return {'error': slot_msg}, 400
             
-            # Check for conflicts with existing appointments
-            conflict = AppointmentController._check_conflicts(
-                provider_id, start_time, end_time
-            )
-            if conflict:
-                return {'error': 'Time slot not available. Conflict with existing appointment'}, 409
-            
-            # Create appointment
-            appointment = Appointment(
-                customer_id=customer_id,
-                provider_id=provider_id,
-                service_id=service_id,
-                vehicle_id=vehicle_id,
-                start_time=start_time,
-                end_time=end_time,
-                status='pending',
-                notes=notes
-            )
-            
-            db.session.add(appointment)
-            db.session.commit()
-            
-            # Send confirmation notifications
-            customer = User.query.get(customer_id)
-            appointment_data = appointment.to_dict(include_relations=True)
-            
-            # Send email notification
-            if customer and customer.email:
-                send_appointment_confirmation(customer.email, appointment_data)
+            # Hold the provider-day lock from the conflict check through the
+            # commit so concurrent requests cannot book the same slot
+            with ExitStack() as locks:
+                locks.enter_context(provider_day_lock(provider_id, start_time.date()))
+                
+                occupancy = AppointmentController._build_day_occupancy(
+                    provider_id, start_time.date(), booked=[]
+                )
+                if not occupancy.is_open(start_time, end_time):
+                    return {'error': 'Provider is not available at this time'}, 400
+                
+                if provider_id:
+                    conflict = AppointmentController._has_conflict(provider_id, start_time, end_time)
+                else:
+                    # Unassigned bookings draw from the shop's pool and get a provider
+                    conflict, provider_id = AppointmentController._assign_provider(start_time, end_time)
+                    if provider_id:
+                        locks.enter_context(provider_day_lock(provider_id, start_time.date()))
+                        conflict = AppointmentController._has_conflict(provider_id, start_time, end_time)
+                    elif not Config.SHOP_BAY_COUNT:
+                        # Without bays the shop's capacity is its staff, so a
+                        # booking nobody can take would overbook it
+                        conflict = True
+                
+                if conflict:
+                    return {'error': 'Time slot not available. Conflict with existing appointment'}, 409
+                
+                # Create appointment
+                appointment = Appointment(
+                    customer_id=customer_id,
+                    provider_id=provider_id,
+                    service_id=service_id,
+                    vehicle_id=vehicle_id,
+                    start_time=start_time,
+                    end_time=end_time,
+                    status='pending',
+                    notes=notes
+                )
+                
+                schedule_change = ScheduleChange(appointment)
+                db.session.add(appointment)
+                schedule_change.stage()
+                
+                # Queue confirmation notifications in the same transaction
+                appointment_data = appointment.to_dict(include_relations=True)
+                AppointmentController._queue_customer_notifications(
+                    appointment.customer, appointment_data,
+                    'appointment_confirmation', 'appointment_sms'
+                )
+                
+                db.session.commit()
+                schedule_change.apply()
             
-            # Send SMS notification
-            if customer and customer.phone:
-                from app.utils.notifications import send_appointment_sms
-                send_appointment_sms(customer.phone, appointment_data)
+            # Push to provider dashboards and slot viewers once the booking is committed
+            notify_new_appointment(appointment_data['provider_id'], appointment_data)
+            AppointmentController._publish_slot_updates(appointment_data['service_id'], schedule_change)
             
             return {
                 'message': 'Appointment created successfully',
                 'appointment': appointment_data
             }, 201
             
+        except IntegrityError as e:
+            db.session.rollback()
+            # The database's overlap constraint caught a booking that raced past the check
+            if AppointmentController._is_overlap_violation(e):
+                return {'error': 'Time slot not available. Conflict with existing appointment'}, 409
+            return {'error': f'Failed to create appointment: {str(e)}'}, 500
+            
         except Exception as e:
             db.session.rollback()
             return {'error': f'Failed to create appointment: {str(e)}'}, 500
     
+    @staticmethod
+    def _is_overlap_violation(error):
+        """Check whether an IntegrityError came from the provider overlap constraint"""
+        diag = getattr(error.orig, 'diag', None)
+        constraint = getattr(diag, 'constraint_name', None) or str(error.orig)
+        return Appointment.OVERLAP_CONSTRAINT in constraint
+    
+    @staticmethod
+    def _queue_customer_notifications(customer, appointment_data, email_kind, sms_kind):
+        """Queue a customer's email and SMS notifications in the current transaction"""
+        appointment_id = appointment_data.get('id')
+        
+        if email_kind and customer and customer.email:
+            enqueue_notification(email_kind, customer.email, appointment_data, appointment_id)
+        
+        if sms_kind and customer and customer.phone:
+            enqueue_notification(sms_kind, customer.phone, appointment_data, appointment_id)
+    
+    @staticmethod
+    def _publish_slot_updates(service_id, schedule_change):
+        """Tell slot viewers about every day a committed write moved a booking on or off"""
+        if schedule_change.before == schedule_change.after:
+            return
+        
+        providers_by_day = {}
+        for footprint in (schedule_change.before, schedule_change.after):
+            if footprint:
+                provider_ids = providers_by_day.setdefault(footprint[1].date(), set())
+                if footprint[0]:
+                    provider_ids.add(footprint[0])
+        
+        # Slots viewed without a provider come from the shared shop pool, so
+        # every service's slots change on the affected days
+        service_ids = [
+            row[0] for row in db.session.query(Service.id).filter_by(is_active=True).all()
+        ]
+        
+        for day, provider_ids in sorted(providers_by_day.items()):
+            broadcast_slot_update(service_id, day.isoformat(), sorted(provider_ids), service_ids)
+    
+    @staticmethod
+    def _load_appointment(appointment_id):
+        """Load an appointment together with every relation its serializer touches"""
+        return with_load_profile(Appointment.query, 'appointment_detail').filter(
+            Appointment.id == appointment_id
+        ).first()
+    
+    @staticmethod
+    def _has_conflict(provider_id, start_time, end_time):
+        """Check a provider's conflicts via the worker's interval index, or the database if it is stale"""
+        conflict = find_cached_conflict(provider_id, start_time, end_time)
+        if conflict is None:
+            conflict = AppointmentController._check_conflicts(provider_id, start_time, end_time)
+        return conflict
+    
+    @staticmethod
+    def _get_shop_pool():
+        """Get the shop's concurrent booking capacity and its active provider IDs"""
+        provider_ids = [
+            row[0] for row in db.session.query(User.id).filter_by(
+                role='provider', is_active=True
+            ).order_by(User.id).all()
+        ]
+        capacity = Config.SHOP_BAY_COUNT or len(provider_ids) or 1
+        return capacity, provider_ids
+    
+    @staticmethod
+    def _get_off_duty_intervals(provider_ids, day):
+        """
+        Get (start, end) for every stretch of a day that a provider isn't working.
+        
+        Without SHOP_BAY_COUNT the shop's capacity is its provider headcount.
+        Counting each provider's time off as a booking of the shop pool
+        shrinks that capacity to the providers working at each moment.
+        Returns nothing when bays set the capacity instead.
+        """
+        if Config.SHOP_BAY_COUNT:
+            return []
+        
+        day_start = datetime.combine(day, datetime.min.time())
+        if not provider_ids:
+            return [(day_start, day_start + timedelta(days=1))]  # Nobody to do the work
+        
+        warm_provider_templates(provider_ids)
+        business_hours = [(Config.BUSINESS_HOURS_START * 60, Config.BUSINESS_HOURS_END * 60)]
+        
+        off_duty = []
+        for provider_id in provider_ids:
+            open_intervals = get_open_intervals(provider_id, day)
+            if open_intervals is None:
+                open_intervals = business_hours
+            free_from = 0
+            for open_start, open_end in sorted(open_intervals) + [(MINUTES_PER_DAY, MINUTES_PER_DAY)]:
+                if open_start > free_from:
+                    off_duty.append((
+                        day_start + timedelta(minutes=free_from),
+                        day_start + timedelta(minutes=open_start)
+                    ))
+                free_from = max(free_from, open_end)
+        return off_duty
+    
+    @staticmethod
+    def _build_shop_occupancy(day, booked=None, pool=None):
+        """
+        Build the occupancy of the shop's pool for unassigned bookings on a day.
+        
+        pool is a (capacity, provider_ids) pair from _get_shop_pool(), and
+        booked the day's bookings as for _build_day_occupancy(); both are
+        loaded when omitted.
+        """
+        capacity, provider_ids = pool or AppointmentController._get_shop_pool()
+        if booked is None:
+            day_start = datetime.combine(day, datetime.min.time())
+            booked = AppointmentController._get_booked_intervals(
+                None, day_start, day_start + timedelta(days=1)
+            )
+        off_duty = AppointmentController._get_off_duty_intervals(provider_ids, day)
+        return AppointmentController._build_day_occupancy(None, day, list(booked) + off_duty, capacity)
+    
+    @staticmethod
+    def _assign_provider(start_time, end_time):
+        """
+        Pick the least-loaded free provider for an unassigned booking.
+        
+        Returns (conflict, provider_id). conflict is True when the shop is
+        already at capacity, counting only providers working at the time
+        unless SHOP_BAY_COUNT is set; provider_id is None when nobody is free
+        to take the booking.
+        """
+        capacity, provider_ids = AppointmentController._get_shop_pool()
+        
+        day_start = datetime.combine(start_time.date(), datetime.min.time())
+        bookings = db.session.query(
+            Appointment.provider_id, Appointment.start_time, Appointment.end_time
+        ).filter(
+            Appointment.status.in_(Appointment.ACTIVE_STATUSES),
+            Appointment.start_time < day_start + timedelta(days=1),
+            Appointment.end_time > day_start
+        ).all()
+        
+        off_duty = AppointmentController._get_off_duty_intervals(provider_ids, start_time.date())
+        overlapping = [
+            (booked_start, booked_end)
+            for booked_start, booked_end in [booking[1:] for booking in bookings] + off_duty
+            if booked_start < end_time and booked_end > start_time
+        ]
+        if peak_concurrency(overlapping, start_time, end_time) >= capacity:
+            return True, None
+        
+        busy = set()
+        booked_minutes = {}
+        for booked_provider, booked_start, booked_end in bookings:
+            if booked_start < end_time and booked_end > start_time:
+                busy.add(booked_provider)
+            booked_minutes[booked_provider] = (
+                booked_minutes.get(booked_provider, 0) +
+                (booked_end - booked_start).total_seconds() / 60
+            )
+        
+        warm_provider_templates(provider_ids)
+        start_minute = start_time.hour * 60 + start_time.minute
+        end_minute = start_minute + (end_time - start_time).total_seconds() / 60
+        
+        free_providers = []
+        for candidate in provider_ids:
+            if candidate in busy:
+                continue
+            open_intervals = get_open_intervals(candidate, start_time.date())
+            if open_intervals is not None and not any(
+                open_start <= start_minute and end_minute <= open_end
+                for open_start, open_end in open_intervals
+            ):
+                continue
+            free_providers.append(candidate)
+        
+        if not free_providers:
+            return False, None
+        
+        return False, min(free_providers, key=lambda candidate: (booked_minutes.get(candidate, 0), candidate))
+    
     @staticmethod
     def _check_conflicts(provider_id, start_time, end_time, exclude_id=None):
         """Check for appointment conflicts"""
         query = Appointment.query.filter(
-            Appointment.status.in_(['pending', 'confirmed', 'in_progress']),
+            Appointment.status.in_(Appointment.ACTIVE_STATUSES),
             or_(
                 and_(Appointment.start_time <= start_time, Appointment.end_time > start_time),
                 and_(Appointment.start_time < end_time, Appointment.end_time >= end_time),
@@ -115,15 +342,42 @@ class AppointmentController:
         return query.first() is not None
     
     @staticmethod
-    def get_appointments(user_id, role, filters=None):
-        """Get appointments based on user role"""
+    def _get_booked_intervals(provider_id, window_start, window_end):
+        """Get (start, end) of active appointments overlapping a window, ordered by start"""
+        query = db.session.query(Appointment.start_time, Appointment.end_time).filter(
+            Appointment.status.in_(Appointment.ACTIVE_STATUSES),
+            Appointment.start_time < window_end,
+            Appointment.end_time > window_start
+        )
+        
+        if provider_id:
+            query = query.filter(Appointment.provider_id == provider_id)
+        
+        return [tuple(row) for row in query.order_by(Appointment.start_time).all()]
+    
+    @staticmethod
+    def get_appointments(user_id, role, filters=None, limit=None, cursor=None):
+        """
+        Get a page of appointments based on user role.
+        
+        Pages run newest first and are keyed on (start_time, id), so every
+        page costs the same however deep it is. Pass the returned
+        next_cursor back as cursor to fetch the following page.
+        """
         try:
+            limit = min(limit or Config.APPOINTMENTS_PAGE_SIZE, Config.APPOINTMENTS_MAX_PAGE_SIZE)
+            if limit < 1:
+                return {'error': 'limit must be positive'}, 400
+            
             query = Appointment.query
             
             if role == 'customer':
                 query = query.filter_by(customer_id=user_id)
             elif role == 'provider':
                 query = query.filter_by(provider_id=user_id)
+            elif role != 'admin':
+                # e.g. a token whose user no longer exists
+                return {'error': 'Unauthorized'}, 403
             
             # Apply filters
             if filters:
@@ -136,28 +390,130 @@ class AppointmentController:
                     end_date = datetime.fromisoformat(filters['end_date'])
                     query = query.filter(Appointment.start_time <= end_date)
             
-            appointments = query.order_by(Appointment.start_time.desc()).all()
+            if cursor:
+                try:
+                    cursor_start, cursor_id = decode_cursor(cursor)
+                except ValueError:
+                    return {'error': 'Invalid cursor'}, 400
+                query = query.filter(
+                    tuple_(Appointment.start_time, Appointment.id) < tuple_(cursor_start, cursor_id)
+                )
+            
+            # Fetch one extra row to learn whether another page follows
+            appointments = with_load_profile(query, 'appointment_list').order_by(
+                Appointment.start_time.desc(), Appointment.id.desc()
+            ).limit(limit + 1).all()
+            
+            next_cursor = None
+            if len(appointments) > limit:
+                appointments = appointments[:limit]
+                next_cursor = encode_cursor(appointments[-1].start_time, appointments[-1].id)
             
             return {
-                'appointments': [apt.to_dict(include_relations=True) for apt in appointments]
+                'appointments': [apt.to_dict(include_relations=True) for apt in appointments],
+                'next_cursor': next_cursor
             }, 200
             
         except Exception as e:
             return {'error': f'Failed to fetch appointments: {str(e)}'}, 500
     
+    EXPORT_COLUMNS = [
+        'id', 'start_time', 'end_time', 'status', 'customer_id', 'customer_email',
+        'provider_id', 'service_id', 'service_name', 'service_price', 'vehicle_id',
+        'cancellation_reason', 'created_at'
+    ]
+    
+    @staticmethod
+    def export_appointments(export_format, filters=None):
+        """
+        Export appointments as NDJSON or CSV.
+        
+        Returns a generator of text chunks. Rows are read through a
+        server-side cursor in batches of EXPORT_BATCH_SIZE and written out
+        one at a time, so memory stays flat whatever the table size.
+        """
+        try:
+            if export_format not in ('ndjson', 'csv'):
+                return {'error': 'format must be ndjson or csv'}, 400
+            
+            query = db.session.query(
+                Appointment.id,
+                Appointment.start_time,
+                Appointment.end_time,
+                Appointment.status,
+                Appointment.customer_id,
+                User.email,
+                Appointment.provider_id,
+                Appointment.service_id,
+                Service.name,
+                Service.price,
+                Appointment.vehicle_id,
+                Appointment.cancellation_reason,
+                Appointment.created_at
+            ).join(User, Appointment.customer_id == User.id).join(
+                Service, Appointment.service_id == Service.id
+            )
+            
+            if filters:
+                try:
+                    if 'status' in filters:
+                        query = query.filter(Appointment.status == filters['status'])
+                    if 'start_date' in filters:
+                        query = query.filter(Appointment.start_time >= datetime.fromisoformat(filters['start_date']))
+                    if 'end_date' in filters:
+                        query = query.filter(Appointment.start_time <= datetime.fromisoformat(filters['end_date']))
+                except ValueError:
+                    return {'error': 'Invalid date format. Use ISO format'}, 400
+            
+            query = query.order_by(Appointment.start_time, Appointment.id).yield_per(
+                Config.EXPORT_BATCH_SIZE
+            )
+            
+            def serialize(value):
+                if isinstance(value, datetime):
+                    return value.isoformat()
+                if isinstance(value, Decimal):
+                    return float(value)
+                return value
+            
+            def generate_ndjson():
+                for row in query:
+                    record = dict(zip(AppointmentController.EXPORT_COLUMNS, map(serialize, row)))
+                    yield json.dumps(record) + '\n'
+            
+            def generate_csv():
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(AppointmentController.EXPORT_COLUMNS)
+                for row in query:
+                    writer.writerow(map(serialize, row))
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                yield buffer.getvalue()
+            
+            return (generate_ndjson() if export_format == 'ndjson' else generate_csv()), 200
+            
+        except Exception as e:
+            return {'error': f'Failed to export appointments: {str(e)}'}, 500
+    
     @staticmethod
     def get_appointment_by_id(appointment_id, user_id, role):
         """Get single appointment by ID"""
         try:
-            appointment = Appointment.query.get(appointment_id)
+            appointment = AppointmentController._load_appointment(appointment_id)
             
             if not appointment:
                 return {'error': 'Appointment not found'}, 404
             
             # Authorization check
-            if role == 'customer' and appointment.customer_id != user_id:
-                return {'error': 'Unauthorized'}, 403
-            elif role == 'provider' and appointment.provider_id != user_id:
+            if role == 'customer':
+                if appointment.customer_id != user_id:
+                    return {'error': 'Unauthorized'}, 403
+            elif role == 'provider':
+                if appointment.provider_id != user_id:
+                    return {'error': 'Unauthorized'}, 403
+            elif role != 'admin':
                 return {'error': 'Unauthorized'}, 403
             
             return {'appointment': appointment.to_dict(include_relations=True)}, 200
@@ -178,6 +534,9 @@ class AppointmentController:
             if role == 'customer' and appointment.customer_id != user_id:
                 return {'error': 'Unauthorized'}, 403
             
+            schedule_change = ScheduleChange(appointment)
+            previous_status = appointment.status
+            
             # Customers can only cancel or update notes
             if role == 'customer':
                 if 'status' in data and data['status'] == 'cancelled':
@@ -197,17 +556,55 @@ class AppointmentController:
             elif role == 'admin':
                 for key, value in data.items():
                     if hasattr(appointment, key) and key not in ['id', 'created_at']:
+                        if key in ['start_time', 'end_time'] and isinstance(value, str):
+                            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                        if key == 'start_time' and value != appointment.start_time:
+                            # A rescheduled appointment gets a fresh reminder
+                            appointment.reminder_sent_at = None
                         setattr(appointment, key, value)
             else:
                 return {'error': 'Unauthorized'}, 403
             
+            schedule_change.stage()
+            
+            # Tell the customer about status changes; the outbox collapses
+            # quick successions into the final state
+            if appointment.status != previous_status:
+                if appointment.status == 'cancelled':
+                    AppointmentController._queue_customer_notifications(
+                        appointment.customer, appointment.to_dict(include_relations=True),
+                        'cancellation_notification', 'cancellation_sms'
+                    )
+                else:
+                    AppointmentController._queue_customer_notifications(
+                        appointment.customer, {'id': appointment.id, 'status': appointment.status},
+                        None, 'status_update_sms'
+                    )
+            
             db.session.commit()
+            schedule_change.apply()
+            
+            appointment = AppointmentController._load_appointment(appointment_id)
+            appointment_data = appointment.to_dict(include_relations=True)
+            
+            if appointment.status != previous_status:
+                notify_appointment_status(appointment.customer_id, appointment_data, previous_status)
+            if appointment.status == 'cancelled' and previous_status != 'cancelled':
+                notify_appointment_cancelled(appointment.provider_id, appointment_data)
+            AppointmentController._publish_slot_updates(appointment.service_id, schedule_change)
             
             return {
                 'message': 'Appointment updated successfully',
-                'appointment': appointment.to_dict(include_relations=True)
+                'appointment': appointment_data
             }, 200
             
+        except IntegrityError as e:
+            db.session.rollback()
+            # An admin moved the booking onto another active one of the same provider
+            if AppointmentController._is_overlap_violation(e):
+                return {'error': 'Time slot not available. Conflict with existing appointment'}, 409
+            return {'error': f'Failed to update appointment: {str(e)}'}, 500
+            
         except Exception as e:
             db.session.rollback()
             return {'error': f'Failed to update appointment: {str(e)}'}, 500
@@ -216,15 +613,19 @@ class AppointmentController:
     def cancel_appointment(appointment_id, user_id, role, reason=''):
         """Cancel an appointment"""
         try:
-            appointment = Appointment.query.get(appointment_id)
+            appointment = AppointmentController._load_appointment(appointment_id)
             
             if not appointment:
                 return {'error': 'Appointment not found'}, 404
             
             # Authorization
-            if role == 'customer' and appointment.customer_id != user_id:
-                return {'error': 'Unauthorized'}, 403
-            elif role == 'provider' and appointment.provider_id != user_id:
+            if role == 'customer':
+                if appointment.customer_id != user_id:
+                    return {'error': 'Unauthorized'}, 403
+            elif role == 'provider':
+                if appointment.provider_id != user_id:
+                    return {'error': 'Unauthorized'}, 403
+            elif role != 'admin':
                 return {'error': 'Unauthorized'}, 403
             
             # Check if already cancelled
@@ -239,24 +640,26 @@ class AppointmentController:
                     'error': f'Cannot cancel within {Config.CANCELLATION_WINDOW_HOURS} hours of appointment'
                 }, 400
             
+            schedule_change = ScheduleChange(appointment)
+            previous_status = appointment.status
             appointment.status = 'cancelled'
             appointment.cancellation_reason = reason
             
-            db.session.commit()
+            schedule_change.stage()
             
-            # Send cancellation notifications
-            customer = User.query.get(appointment.customer_id)
+            # Queue cancellation notifications in the same transaction
             appointment_data = appointment.to_dict(include_relations=True)
+            AppointmentController._queue_customer_notifications(
+                appointment.customer, appointment_data,
+                'cancellation_notification', 'cancellation_sms'
+            )
             
-            # Email notification
-            if customer and customer.email:
-                from app.utils.notifications import send_cancellation_notification
-                send_cancellation_notification(customer.email, appointment_data)
+            db.session.commit()
+            schedule_change.apply()
             
-            # SMS notification
-            if customer and customer.phone:
-                from app.utils.notifications import send_cancellation_sms
-                send_cancellation_sms(customer.phone, appointment_data)
+            notify_appointment_status(appointment_data['customer_id'], appointment_data, previous_status)
+            notify_appointment_cancelled(appointment_data['provider_id'], appointment_data)
+            AppointmentController._publish_slot_updates(appointment_data['service_id'], schedule_change)
             
             return {
                 'message': 'Appointment cancelled successfully',
@@ -277,33 +680,136 @@ class AppointmentController:
             
             target_date = datetime.fromisoformat(date_str).date()
             
-            # Get business hours
-            start_hour = Config.BUSINESS_HOURS_START
-            end_hour = Config.BUSINESS_HOURS_END
+            # Read before the slots so a client syncing from slots_delta
+            # pushes never skips a change made in between
+            version = get_schedule_version(lane_for(provider_id), target_date)
             
-            # Generate all possible slots
+            # Closed days have no slots, as in the range endpoint
             slots = []
-            current_time = datetime.combine(target_date, datetime.min.time()).replace(hour=start_hour)
-            end_time = datetime.combine(target_date, datetime.min.time()).replace(hour=end_hour)
+            if is_business_day(target_date):
+                if provider_id:
+                    occupancy = AppointmentController._build_day_occupancy(provider_id, target_date)
+                else:
+                    occupancy = AppointmentController._build_shop_occupancy(target_date)
+                slots = AppointmentController._build_slots(occupancy, service.duration_minutes)
             
-            while current_time < end_time:
-                slot_end = current_time + timedelta(minutes=service.duration_minutes)
-                
-                if slot_end.hour <= end_hour:
-                    # Check if slot is available
-                    is_available = not AppointmentController._check_conflicts(
-                        provider_id, current_time, slot_end
-                    )
+            return {'slots': slots, 'date': date_str, 'version': version}, 200
+            
+        except Exception as e:
+            return {'error': f'Failed to fetch available slots: {str(e)}'}, 500
+    
+    @staticmethod
+    def get_available_slots_range(service_id, start_date_str, end_date_str, provider_id=None):
+        """
+        Get available time slots for every day in a date range.
+        
+        Returns a generator of per-day results so the view can stream them.
+        The service, shop capacity and all bookings in the range are loaded
+        up front; the generator itself does no database work.
+        """
+        try:
+            try:
+                start_date = datetime.fromisoformat(start_date_str).date()
+                end_date = datetime.fromisoformat(end_date_str).date()
+            except ValueError:
+                return {'error': 'Invalid date format. Use ISO format'}, 400
+            
+            if end_date < start_date:
+                return {'error': 'end_date must not be before start_date'}, 400
+            
+            num_days = (end_date - start_date).days + 1
+            if num_days > Config.MAX_SLOT_RANGE_DAYS:
+                return {'error': f'Date range cannot exceed {Config.MAX_SLOT_RANGE_DAYS} days'}, 400
+            
+            service = Service.query.get(service_id)
+            if not service:
+                return {'error': 'Service not found'}, 404
+            
+            days = [start_date + timedelta(days=offset) for offset in range(num_days)]
+            
+            # Warm the availability templates before streaming starts
+            get_open_intervals(provider_id, start_date)
+            pool = None if provider_id else AppointmentController._get_shop_pool()
+            if pool:
+                warm_provider_templates(pool[1])
+            
+            # One bounded query covering every day in the range
+            range_start = datetime.combine(start_date, datetime.min.time())
+            booked = AppointmentController._get_booked_intervals(
+                provider_id, range_start, range_start + timedelta(days=num_days)
+            )
+            
+            def generate_days():
+                first_relevant = 0
+                for day in days:
+                    slots = []
+                    if is_business_day(day):
+                        day_start = datetime.combine(day, datetime.min.time())
+                        # Skip bookings that ended before this day started
+                        while (first_relevant < len(booked) and
+                               booked[first_relevant][1] <= day_start):
+                            first_relevant += 1
+                        if provider_id:
+                            occupancy = AppointmentController._build_day_occupancy(
+                                provider_id, day, booked[first_relevant:]
+                            )
+                        else:
+                            occupancy = AppointmentController._build_shop_occupancy(
+                                day, booked[first_relevant:], pool
+                            )
+                        slots = AppointmentController._build_slots(
+                            occupancy, service.duration_minutes
+                        )
                     
-                    slots.append({
-                        'start_time': current_time.isoformat(),
-                        'end_time': slot_end.isoformat(),
-                        'available': is_available
-                    })
-                
-                current_time += timedelta(minutes=30)  # 30-minute intervals
+                    yield {
+                        'date': day.isoformat(),
+                        'is_business_day': is_business_day(day),
+                        'slots': slots
+                    }
             
-            return {'slots': slots, 'date': date_str}, 200
+            return generate_days(), 200
             
         except Exception as e:
-            return {'error': f'Failed to fetch available slots: {str(e)}'}, 500
\ No newline at end of file
+            return {'error': f'Failed to fetch available slots: {str(e)}'}, 500
+    
+    @staticmethod
+    def _build_day_occupancy(provider_id, target_date, booked=None, capacity=1):
+        """
+        Build the occupancy bitmap for a provider-day.
+        
+        Working time comes from the provider's availability template, or
+        business hours when there is none. booked is a start-ordered list of
+        (start, end) intervals; when omitted the day's bookings are queried.
+        Time only counts as taken once `capacity` bookings overlap it.
+        """
+        occupancy = DayOccupancy(target_date)
+        
+        open_intervals = get_open_intervals(provider_id, target_date)
+        if open_intervals is None:
+            open_intervals = [(Config.BUSINESS_HOURS_START * 60, Config.BUSINESS_HOURS_END * 60)]
+        for open_start, open_end in open_intervals:
+            occupancy.add_open_interval(open_start, open_end)
+        
+        if booked is None:
+            booked = AppointmentController._get_booked_intervals(
+                provider_id, occupancy.day_start, occupancy.day_start + timedelta(days=1)
+            )
+        day_end = occupancy.day_start + timedelta(days=1)
+        occupancy.add_bookings(
+            [(booked_start, booked_end) for booked_start, booked_end in booked if booked_start < day_end],
+            capacity
+        )
+        
+        return occupancy
+    
+    @staticmethod
+    def _build_slots(occupancy, duration_minutes):
+        """Build the slots payload for a service duration from a day's occupancy"""
+        return [
+            {
+                'start_time': slot_start.isoformat(),
+                'end_time': slot_end.isoformat(),
+                'available': is_available
+            }
+            for slot_start, slot_end, is_available in occupancy.slots(duration_minutes)
+        ]
\ No newline at end of file
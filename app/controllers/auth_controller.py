@@ -1,12 +1,21 @@
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models.user import User
-from flask_jwt_extended import create_access_token, create_refresh_token
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from app.utils.auth import check_auth_rate_limit, invalidate_cached_user, user_claims
+from app.utils.passwords import hash_passwords
+from app.utils.revocation import revoke_token
 from app.utils.validators import validate_email, validate_password
+from config import Config
 
 class AuthController:
     
+    ROLES = ('customer', 'provider', 'admin')
+    
     @staticmethod
-    def register(data):
+    def register(data, client_ip=None):
         try:
             email = data.get('email', '').strip().lower()
             password = data.get('password', '')
@@ -18,6 +27,10 @@ class AuthController:
             if not all([email, password, first_name, last_name]):
                 return {'error': 'Missing required fields'}, 400
             
+            retry_after = check_auth_rate_limit('register', client_ip, email)
+            if retry_after:
+                return {'error': 'Too many attempts, try again later', 'retry_after': retry_after}, 429
+            
             if not validate_email(email):
                 return {'error': 'Invalid email format'}, 400
             
@@ -28,7 +41,7 @@ class AuthController:
             if User.query.filter_by(email=email).first():
                 return {'error': 'Email already registered'}, 409
             
-            if role not in ['customer', 'provider', 'admin']:
+            if role not in AuthController.ROLES:
                 return {'error': 'Invalid role'}, 400
             
             user = User(
@@ -43,7 +56,7 @@ class AuthController:
             db.session.add(user)
             db.session.commit()
             
-            access_token = create_access_token(identity=user.id)
+            access_token = create_access_token(identity=user.id, additional_claims=user_claims(user))
             refresh_token = create_refresh_token(identity=user.id)
             
             return {
@@ -58,7 +71,7 @@ class AuthController:
             return {'error': f'Registration failed: {str(e)}'}, 500
     
     @staticmethod
-    def login(data):
+    def login(data, client_ip=None):
         try:
             email = data.get('email', '').strip().lower()
             password = data.get('password', '')
@@ -66,6 +79,10 @@ class AuthController:
             if not email or not password:
                 return {'error': 'Email and password required'}, 400
             
+            retry_after = check_auth_rate_limit('login', client_ip, email)
+            if retry_after:
+                return {'error': 'Too many attempts, try again later', 'retry_after': retry_after}, 429
+            
             # Find user
             user = User.query.filter_by(email=email).first()
             
@@ -75,7 +92,7 @@ class AuthController:
             if not user.is_active:
                 return {'error': 'Account is deactivated'}, 403
             
-            access_token = create_access_token(identity=user.id)
+            access_token = create_access_token(identity=user.id, additional_claims=user_claims(user))
             refresh_token = create_refresh_token(identity=user.id)
             
             return {
@@ -88,10 +105,59 @@ class AuthController:
         except Exception as e:
             return {'error': f'Login failed: {str(e)}'}, 500
     
+    @staticmethod
+    def refresh(user_id):
+        """Issue a new access token for the holder of a refresh token"""
+        try:
+            # Read the row, not the cache, so the new token carries the current role
+            user = User.query.get(user_id)
+            if not user:
+                return {'error': 'User not found'}, 404
+            
+            if not user.is_active:
+                return {'error': 'Account is deactivated'}, 403
+            
+            access_token = create_access_token(identity=user.id, additional_claims=user_claims(user))
+            
+            return {'access_token': access_token}, 200
+            
+        except Exception as e:
+            return {'error': f'Token refresh failed: {str(e)}'}, 500
+    
+    @staticmethod
+    def logout(jwt_payload, data):
+        """
+        Revoke the token the request was made with.
+        
+        The client may also send its refresh token as refresh_token, so a
+        single call ends the session.
+        """
+        try:
+            refresh_payload = None
+            refresh_token = (data or {}).get('refresh_token')
+            if refresh_token:
+                try:
+                    refresh_payload = decode_token(refresh_token)
+                except Exception:
+                    return {'error': 'Invalid refresh token'}, 400
+                if refresh_payload['type'] != 'refresh' or refresh_payload['sub'] != jwt_payload['sub']:
+                    return {'error': 'Invalid refresh token'}, 400
+            
+            revoke_token(jwt_payload)
+            if refresh_payload:
+                revoke_token(refresh_payload)
+            
+            return {'message': 'Logout successful'}, 200
+            
+        except Exception as e:
+            db.session.rollback()
+            return {'error': f'Logout failed: {str(e)}'}, 500
+    
     @staticmethod
     def get_user_profile(user_id):
         """Get user profile by ID"""
         try:
+            # Read the row; the user cache is only dropped in the worker that saved a change
             user = User.query.get(user_id)
             if not user:
                 return {'error': 'User not found'}, 404
@@ -117,6 +183,7 @@ class AuthController:
                 user.phone = data['phone'].strip()
             
             db.session.commit()
+            invalidate_cached_user(user_id)
             
             return {
                 'message': 'Profile updated successfully',
@@ -126,4 +193,101 @@ class AuthController:
         except Exception as e:
             db.session.rollback()
             return {'error': f'Update failed: {str(e)}'}, 500
+    
+    @staticmethod
+    def import_users(rows):
+        """
+        Create many users at once (admin bulk import).
         
+        rows are dicts as returned by parse_user_rows(). Every row is
+        checked like /auth/register; rows that fail are reported by index
+        and skipped. Existing emails are found with one IN query, the
+        valid rows' passwords are hashed in parallel, and the users are
+        inserted in a single executemany, all in one transaction.
+        """
+        try:
+            if len(rows) > Config.USER_IMPORT_MAX_ROWS:
+                return {'error': f'At most {Config.USER_IMPORT_MAX_ROWS} users per import'}, 400
+            
+            errors = []
+            candidates = []
+            seen = set()
+            for index, row in enumerate(rows):
+                email = row['email'].lower()
+                role = row['role'] or 'customer'
+                error = None
+                if not all([email, row['password'], row['first_name'], row['last_name']]):
+                    error = 'Missing required fields'
+                elif not validate_email(email, check_deliverability=False):
+                    error = 'Invalid email format'
+                elif role not in AuthController.ROLES:
+                    error = 'Invalid role'
+                elif email in seen:
+                    error = 'Duplicate email in import'
+                else:
+                    password_valid, error = validate_password(row['password'])
+                    error = None if password_valid else error
+                
+                if error:
+                    errors.append({'row': index, 'email': email, 'error': error})
+                    continue
+                seen.add(email)
+                candidates.append((index, {**row, 'email': email, 'role': role}))
+            
+            # Deliverability is a DNS lookup per domain, not per address
+            deliverable = {}
+            for index, row in candidates:
+                domain = row['email'].rsplit('@', 1)[1]
+                if domain not in deliverable:
+                    deliverable[domain] = validate_email(row['email'])
+            
+            existing = set()
+            if candidates:
+                existing = {
+                    email for (email,) in db.session.query(User.email).filter(
+                        User.email.in_([row['email'] for _, row in candidates])
+                    ).all()
+                }
+            
+            valid = []
+            for index, row in candidates:
+                if not deliverable[row['email'].rsplit('@', 1)[1]]:
+                    errors.append({'row': index, 'email': row['email'], 'error': 'Invalid email format'})
+                elif row['email'] in existing:
+                    errors.append({'row': index, 'email': row['email'], 'error': 'Email already registered'})
+                else:
+                    valid.append(row)
+            
+            if valid:
+                password_hashes = hash_passwords([row['password'] for row in valid])
+                now = datetime.utcnow()
+                db.session.execute(insert(User), [
+                    {
+                        'email': row['email'],
+                        'password_hash': password_hash,
+                        'first_name': row['first_name'],
+                        'last_name': row['last_name'],
+                        'phone': row['phone'],
+                        'role': row['role'],
+                        'is_active': True,
+                        'created_at': now,
+                        'updated_at': now
+                    }
+                    for row, password_hash in zip(valid, password_hashes)
+                ])
+                db.session.commit()
+            
+            errors.sort(key=lambda error: error['row'])
+            return {
+                'message': f'Imported {len(valid)} of {len(rows)} users',
+                'imported': len(valid),
+                'failed': len(errors),
+                'errors': errors
+            }, 200
+            
+        except IntegrityError:
+            db.session.rollback()
+            return {'error': 'Some emails were registered during the import; nothing was imported, retry it'}, 409
+        except Exception as e:
+            db.session.rollback()
+            return {'error': f'Import failed: {str(e)}'}, 500
\ No newline at end of file
@@ -0,0 +1,42 @@
+from app import db
+from app.models.notification_outbox import NotificationOutbox
+from app.utils.auth import get_auth_rate_limiters
+from app.utils.passwords import get_password_pool_stats
+from app.utils.transports import get_transport, get_transport_stats
+
+class InstrumentationController:
+    
+    @staticmethod
+    def get_notification_health():
+        """Get transport counters, circuit breaker state and outbox backlog"""
+        try:
+            # Make sure both channels are reported even before their first send
+            get_transport('email')
+            get_transport('sms')
+            
+            outbox = dict(
+                db.session.query(NotificationOutbox.status, db.func.count(NotificationOutbox.id))
+                .group_by(NotificationOutbox.status).all()
+            )
+            
+            return {
+                # Breakers and counters are per worker process
+                'transports': get_transport_stats(),
+                'outbox': outbox
+            }, 200
+            
+        except Exception as e:
+            return {'error': f'Failed to fetch notification health: {str(e)}'}, 500
+    
+    @staticmethod
+    def get_password_pool_health():
+        """Get password hashing queue depth and latency, and login throttling, for this worker"""
+        try:
+            ip_limiter, email_limiter = get_auth_rate_limiters()
+            return {
+                'password_pool': get_password_pool_stats(),
+                'auth_rate_limits': {'ip': ip_limiter.to_dict(), 'email': email_limiter.to_dict()}
+            }, 200
+            
+        except Exception as e:
+            return {'error': f'Failed to fetch password pool health: {str(e)}'}, 500
\ No newline at end of file
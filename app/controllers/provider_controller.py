@@ -1,6 +1,7 @@
 from app import db
 from app.models.user import User
 from app.models.availability import Availability
+from app.utils.availability_templates import invalidate_provider_template
 from datetime import time
 
 class ProviderController:
@@ -102,6 +103,7 @@ class ProviderController:
                 )
                 db.session.add(availability)
             
+            invalidate_provider_template(provider_id)
             db.session.commit()
             
             return {
@@ -141,6 +143,7 @@ class ProviderController:
                 return {'error': 'Availability not found'}, 404
             
             db.session.delete(availability)
+            invalidate_provider_template(provider_id)
             db.session.commit()
             
             return {'message': 'Availability deleted successfully'}, 200
@@ -1,6 +1,8 @@
 from app import db
 from app.models.vehicle import Vehicle
+from app.models.appointment import Appointment
 from app.utils.validators import validate_vehicle_year
+from app.utils.load_profiles import with_load_profile
 
 class VehicleController:
     
@@ -149,7 +151,6 @@ class VehicleController:
                 return {'error': 'Vehicle not found'}, 404
             
             # Check if vehicle has any appointments
-            from app.models.appointment import Appointment
             has_appointments = Appointment.query.filter_by(
                 vehicle_id=vehicle_id
             ).first()
@@ -180,7 +181,9 @@ class VehicleController:
             if not vehicle:
                 return {'error': 'Vehicle not found'}, 404
             
-            appointments = vehicle.appointments
+            appointments = with_load_profile(Appointment.query, 'appointment_list').filter(
+                Appointment.vehicle_id == vehicle_id
+            ).all()
             
             return {
                 'vehicle': vehicle.to_dict(),
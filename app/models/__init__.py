@@ -3,5 +3,8 @@ from app.models.service import Service
 from app.models.appointment import Appointment
 from app.models.vehicle import Vehicle
 from app.models.availability import Availability
+from app.models.schedule_version import ScheduleVersion
+from app.models.notification_outbox import NotificationOutbox
+from app.models.revoked_token import RevokedToken
 
-__all__ = ['User', 'Service', 'Appointment', 'Vehicle', 'Availability']
\ No newline at end of file
+__all__ = ['User', 'Service', 'Appointment', 'Vehicle', 'Availability', 'ScheduleVersion', 'NotificationOutbox', 'RevokedToken']
\ No newline at end of file
@@ -1,9 +1,16 @@
 from app import db
 from datetime import datetime
+from sqlalchemy import DDL, event, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 
 class Appointment(db.Model):
     __tablename__ = 'appointments'
     
+    # Statuses that occupy a slot on the schedule
+    ACTIVE_STATUSES = ('pending', 'confirmed', 'in_progress')
+    # Name of the PostgreSQL constraint refusing overlapping bookings
+    OVERLAP_CONSTRAINT = 'excl_appointments_provider_overlap'
+    
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     provider_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -18,10 +25,30 @@ class Appointment(db.Model):
     
     notes = db.Column(db.Text, nullable=True)
     cancellation_reason = db.Column(db.Text, nullable=True)
+    reminder_sent_at = db.Column(db.DateTime, nullable=True)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Conflict checks and listings filter on the owner first, then walk
+        # (start_time, id) for keyset pagination
+        db.Index('ix_appointments_provider_start', 'provider_id', 'start_time', 'id'),
+        db.Index('ix_appointments_customer_start', 'customer_id', 'start_time', 'id'),
+        db.Index('ix_appointments_start_id', 'start_time', 'id'),
+        # The reminder scheduler scans unreminded appointments by start time
+        db.Index('ix_appointments_reminder_due', 'reminder_sent_at', 'start_time'),
+        # PostgreSQL refuses overlapping active bookings for the same provider,
+        # even when two requests pass the application-level check at once
+        ExcludeConstraint(
+            (provider_id, '='),
+            (func.tsrange(start_time, end_time), '&&'),
+            name=OVERLAP_CONSTRAINT,
+            using='gist',
+            where=text('status IN (%s)' % ', '.join(f"'{status}'" for status in ACTIVE_STATUSES))
+        ).ddl_if(dialect='postgresql'),
+    )
+    
     # Relationships
     customer = db.relationship('User', foreign_keys=[customer_id], back_populates='appointments')
     provider = db.relationship('User', foreign_keys=[provider_id], back_populates='provider_appointments')
@@ -52,4 +79,12 @@ class Appointment(db.Model):
         return data
     
     def __repr__(self):
-        return f'<Appointment {self.id} - {self.status}>'
\ No newline at end of file
+        return f'<Appointment {self.id} - {self.status}>'
+
+
+# The exclusion constraint compares provider_id with '=' inside a GiST index
+event.listen(
+    Appointment.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS btree_gist').execute_if(dialect='postgresql')
+)
\ No newline at end of file
@@ -0,0 +1,47 @@
+from app import db
+from datetime import datetime
+
+class NotificationOutbox(db.Model):
+    __tablename__ = 'notification_outbox'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g., 'appointment_confirmation', 'cancellation_sms'
+    recipient = db.Column(db.String(120), nullable=False)  # Email address or phone number
+    payload = db.Column(db.JSON, nullable=False)  # Appointment data passed to the sender
+    
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=True)
+    coalesce_key = db.Column(db.String(200), nullable=True)  # Messages sharing a key replace each other
+    content_hash = db.Column(db.String(64), nullable=True)  # Identifies exact duplicates
+    
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    # Status options: pending, sent, failed, superseded
+    
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Not sent before this time
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        # The dispatcher polls for due pending rows
+        db.Index('ix_notification_outbox_status_available', 'status', 'available_at'),
+        # Coalescing looks up the latest messages for a recipient and appointment
+        db.Index('ix_notification_outbox_coalesce', 'coalesce_key', 'id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'recipient': self.recipient,
+            'appointment_id': self.appointment_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'available_at': self.available_at.isoformat() if self.available_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
+    
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} - {self.kind} - {self.status}>'
\ No newline at end of file
@@ -0,0 +1,24 @@
+from app import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False)  # access, refresh
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # Row can be purged after this
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Workers sync new rows by this
+    
+    def to_dict(self):
+        return {
+            'jti': self.jti,
+            'token_type': self.token_type,
+            'user_id': self.user_id,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'revoked_at': self.revoked_at.isoformat() if self.revoked_at else None
+        }
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.token_type} {self.jti}>'
\ No newline at end of file
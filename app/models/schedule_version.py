@@ -0,0 +1,26 @@
+from app import db
+from datetime import datetime
+
+class ScheduleVersion(db.Model):
+    __tablename__ = 'schedule_versions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    lane = db.Column(db.Integer, nullable=False)  # Provider ID, or 0 for the whole shop
+    day = db.Column(db.Date, nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('lane', 'day', name='uq_schedule_versions_lane_day'),
+    )
+    
+    def to_dict(self):
+        return {
+            'lane': self.lane,
+            'day': self.day.isoformat() if self.day else None,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<ScheduleVersion Lane {self.lane} - {self.day} v{self.version}>'
\ No newline at end of file
@@ -1,6 +1,6 @@
 from app import db
 from datetime import datetime
-import bcrypt
+from app.utils.passwords import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -25,16 +25,10 @@ class User(db.Model):
     availability = db.relationship('Availability', back_populates='provider', cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = bcrypt.hashpw(
-            password.encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return bcrypt.checkpw(
-            password.encode('utf-8'),
-            self.password_hash.encode('utf-8')
-        )
+        return verify_password(password, self.password_hash)
     
     def to_dict(self, include_sensitive=False):
         data = {
@@ -1,11 +1,79 @@
+from datetime import date as date_type
+from flask import current_app, session
+from flask_jwt_extended import decode_token
 from flask_socketio import emit, join_room, leave_room
 from app import socketio
+from app.sockets.slot_push import queue_slot_push
+from app.utils.auth import get_cached_user
+from app.utils.revocation import is_token_revoked
+
+def slot_room(service_id, date, provider_id=None):
+    """Room of clients watching a service's slots on a date, with one provider or the shop pool"""
+    if provider_id:
+        return f'slots_provider_{provider_id}_service_{service_id}_{date}'
+    return f'slots_service_{service_id}_{date}'
+
+def _parse_slot_subscription(data):
+    """Get the slot room named by a subscribe/unsubscribe payload, or None if invalid"""
+    data = data or {}
+    try:
+        date = date_type.fromisoformat(data.get('date', '')).isoformat()
+        if data.get('service_id'):
+            provider_id = int(data['provider_id']) if data.get('provider_id') else None
+            return slot_room(int(data['service_id']), date, provider_id)
+    except (TypeError, ValueError):
+        pass
+    return None
+
+def user_room(user_id):
+    """Room of every socket the user is connected with"""
+    return f'user_{user_id}'
+
+def provider_room(provider_id):
+    """Room of the sockets receiving a provider's booking updates"""
+    return f'provider_{provider_id}'
+
+def _may_watch_provider(provider_id):
+    """Whether this socket's user may receive a provider's bookings: that provider or an admin"""
+    role = session.get('role')
+    return role == 'admin' or (role == 'provider' and session.get('user_id') == provider_id)
 
 @socketio.on('connect')
-def handle_connect():
-    """Handle client connection"""
+def handle_connect(auth=None):
+    """
+    Handle client connection.
+    
+    A client that sends its access token in the connect payload
+    (auth={'token': ...}) joins its user room here, once, so later pushes
+    need no lookups; a provider joins its provider room as well.
+    Connections without a token stay anonymous; a bad token is refused.
+    """
+    # Never from the query string: long-polling repeats it on every
+    # request, and access logs would record the token
+    token = auth.get('token') if isinstance(auth, dict) else None
+    
+    user_id = None
+    if token:
+        try:
+            claims = decode_token(token)
+        except Exception:
+            return False
+        if claims.get('type') != 'access' or is_token_revoked(None, claims):
+            return False
+        user_id = claims['sub']
+        role = claims.get('role')
+        if role is None:
+            # Tokens issued before role claims existed
+            user = get_cached_user(user_id)
+            role = user['role'] if user else None
+        session['user_id'] = user_id
+        session['role'] = role
+        join_room(user_room(user_id))
+        if role == 'provider':
+            join_room(provider_room(user_id))
+    
     print('Client connected')
-    emit('connection_response', {'status': 'connected'})
+    emit('connection_response', {'status': 'connected', 'user_id': user_id})
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -14,37 +82,108 @@ def handle_disconnect():
 
 @socketio.on('join_provider_room')
 def handle_join_provider_room(data):
-    """Provider joins their room to receive booking updates"""
-    provider_id = data.get('provider_id')
-    if provider_id:
-        room = f'provider_{provider_id}'
-        join_room(room)
-        emit('room_joined', {'room': room})
+    """
+    Join a provider's room to receive its booking updates.
+    
+    The updates carry customer contact details, so only that provider
+    (signed in on this socket) or an admin may join.
+    """
+    try:
+        provider_id = int((data or {}).get('provider_id'))
+    except (TypeError, ValueError):
+        return
+    if not _may_watch_provider(provider_id):
+        emit('room_error', {'error': 'Provider access required'})
+        return
+    room = provider_room(provider_id)
+    join_room(room)
+    emit('room_joined', {'room': room})
 
 @socketio.on('leave_provider_room')
 def handle_leave_provider_room(data):
     """Provider leaves their room"""
-    provider_id = data.get('provider_id')
+    provider_id = (data or {}).get('provider_id')
     if provider_id:
-        room = f'provider_{provider_id}'
+        room = provider_room(provider_id)
         leave_room(room)
         emit('room_left', {'room': room})
 
+@socketio.on('subscribe_slots')
+def handle_subscribe_slots(data):
+    """
+    Client watches a service's slots on a date, like GET
+    /appointments/available-slots with the same service_id, date and
+    optional provider_id.
+    """
+    room = _parse_slot_subscription(data)
+    if not room:
+        emit('subscription_error', {'error': 'date and service_id are required'})
+        return
+    join_room(room)
+    emit('slots_subscribed', {'room': room})
+
+@socketio.on('unsubscribe_slots')
+def handle_unsubscribe_slots(data):
+    """Client stops watching a service's slots on a date"""
+    room = _parse_slot_subscription(data)
+    if room:
+        leave_room(room)
+        emit('slots_unsubscribed', {'room': room})
+
+def _publish(event, data, **kwargs):
+    """
+    Emit an event to connected clients without letting a socket failure
+    break the request that triggered it.
+
+    With SOCKETIO_MESSAGE_QUEUE set this publishes to the broker, and every
+    worker delivers it to its own clients.
+    """
+    try:
+        socketio.emit(event, data, **kwargs)
+    except Exception as e:
+        print(f"Socket emit of {event} failed: {str(e)}")
+
 def notify_new_appointment(provider_id, appointment_data):
     """Notify provider of new appointment"""
     if provider_id:
-        room = f'provider_{provider_id}'
-        socketio.emit('new_appointment', appointment_data, room=room)
+        _publish('new_appointment', appointment_data, room=provider_room(provider_id))
 
 def notify_appointment_cancelled(provider_id, appointment_data):
     """Notify provider of cancelled appointment"""
     if provider_id:
-        room = f'provider_{provider_id}'
-        socketio.emit('appointment_cancelled', appointment_data, room=room)
-
-def broadcast_slot_update(service_id, date):
-    """Broadcast that slots have been updated"""
-    socketio.emit('slots_updated', {
-        'service_id': service_id,
-        'date': date
-    }, broadcast=True)
\ No newline at end of file
+        _publish('appointment_cancelled', appointment_data, room=provider_room(provider_id))
+
+def notify_appointment_status(customer_id, appointment_data, previous_status):
+    """Push an appointment's status change to its customer's sockets"""
+    if customer_id:
+        _publish('appointment_status', {
+            'appointment_id': appointment_data.get('id'),
+            'status': appointment_data.get('status'),
+            'previous_status': previous_status,
+            'start_time': appointment_data.get('start_time'),
+            'end_time': appointment_data.get('end_time'),
+            'cancellation_reason': appointment_data.get('cancellation_reason')
+        }, to=user_room(customer_id))
+
+def broadcast_slot_update(service_id, date, provider_ids=(), service_ids=None):
+    """
+    Push slot changes to the clients watching the affected slots.
+
+    Covers the shop pool rooms of service_ids (default: just the booked
+    service) on the date, and the rooms of provider_ids for each of those
+    services. The push is debounced: each room gets one slots_delta per
+    window with the slots that changed, not a bare notice that makes every
+    client refetch.
+    """
+    day = date_type.fromisoformat(date)
+    rooms = {}
+    for sid in (service_ids or [service_id]):
+        rooms[slot_room(sid, date)] = (sid, None, day)
+        rooms.update({
+            slot_room(sid, date, pid): (sid, pid, day)
+            for pid in provider_ids if pid
+        })
+    try:
+        queue_slot_push(current_app._get_current_object(), rooms)
+    except Exception as e:
+        print(f"Queueing slot push failed: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+from app import db, socketio
+from app.models.service import Service
+from app.utils.conflict_index import get_schedule_version, lane_for
+from config import Config
+
+# room -> (service_id, provider_id or None, date) waiting for the next flush
+_pending = {}
+# room -> (version, {slot start: available}) as last pushed by this worker.
+# Each worker keeps its own, so with several workers (or containers behind
+# a message queue) a room's deltas come from whichever worker handled the
+# write, each starting at the version that worker last pushed. Clients
+# then hit from_version gaps more often and refetch; the versions
+# themselves are the shared schedule versions, so a gap is always noticed.
+_snapshots = OrderedDict()
+_lock = threading.Lock()
+_flush_scheduled = False
+
+
+def queue_slot_push(app, rooms):
+    """
+    Mark slot rooms as changed and push their deltas after a short delay.
+
+    rooms maps room name -> (service_id, provider_id, date), with a
+    provider_id of None for the shop pool. Every change queued within SLOT_PUSH_DEBOUNCE_SECONDS of
+    the first one is pushed by the same flush, so a burst of bookings
+    costs each room at most one frame per window.
+    """
+    global _flush_scheduled
+    with _lock:
+        _pending.update(rooms)
+        if _flush_scheduled:
+            return
+        _flush_scheduled = True
+    socketio.start_background_task(_flush_slot_pushes, app)
+
+
+def _flush_slot_pushes(app):
+    global _flush_scheduled
+    socketio.sleep(Config.SLOT_PUSH_DEBOUNCE_SECONDS)
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _flush_scheduled = False
+
+    rooms_by_date = {}
+    for room, (service_id, provider_id, date) in pending.items():
+        rooms_by_date.setdefault(date, {})[room] = (service_id, provider_id)
+
+    with app.app_context():
+        try:
+            for date, rooms in sorted(rooms_by_date.items()):
+                _push_day(date, rooms)
+        except Exception as e:
+            print(f"Slot push failed: {str(e)}")
+        finally:
+            db.session.remove()
+
+
+def _push_day(date, rooms):
+    """Compute each room's slots for a day once and emit what changed"""
+    from app.controllers.appointment_controller import AppointmentController
+
+    service_ids = {service_id for service_id, _ in rooms.values()}
+    durations = dict(
+        db.session.query(Service.id, Service.duration_minutes).filter(Service.id.in_(service_ids)).all()
+    )
+
+    # A day's occupancy and version per lane, shared by every service's
+    # rooms: the shop pool's for slots viewed without a provider, and each
+    # provider's own. The slots then follow the service's duration, as in
+    # GET /appointments/available-slots.
+    lanes = {}
+
+    for room, (service_id, provider_id) in rooms.items():
+        if service_id not in durations:
+            continue
+        if provider_id not in lanes:
+            if provider_id:
+                occupancy = AppointmentController._build_day_occupancy(provider_id, date)
+            else:
+                occupancy = AppointmentController._build_shop_occupancy(date)
+            # Read the version after the state, so a snapshot is never
+            # newer than its version and the next delta still carries
+            # anything that raced in between
+            lanes[provider_id] = (occupancy, get_schedule_version(lane_for(provider_id), date))
+        occupancy, version = lanes[provider_id]
+
+        state = {
+            slot_start.isoformat(): available
+            for slot_start, _, available in occupancy.slots(durations[service_id])
+        }
+        scope = {'service_id': service_id, 'provider_id': provider_id, 'date': date.isoformat()}
+        _emit_delta(room, scope, version, state)
+
+
+def _emit_delta(room, scope, version, state):
+    """
+    Emit the slots of a room that changed since this worker's last push.
+
+    Clients apply a delta only when its from_version equals the version
+    they hold (from GET /appointments/available-slots or the previous
+    delta), ignore ones not newer than it, and refetch on any other gap.
+    A from_version of None carries the room's full slot list.
+    """
+    with _lock:
+        previous = _snapshots.get(room)
+        if previous and version < previous[0]:
+            return  # An overlapping flush already pushed something newer
+        _snapshots[room] = (version, state)
+        _snapshots.move_to_end(room)
+        while len(_snapshots) > Config.SLOT_PUSH_MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+
+    if previous is None:
+        from_version = None
+        changes = list(state.items())
+    else:
+        from_version, previous_state = previous
+        if from_version == version and previous_state == state:
+            return
+        changes = [
+            (start, available) for start, available in state.items()
+            if previous_state.get(start) != available
+        ]
+        # Slots that disappeared, e.g. after working hours changed
+        changes += [(start, False) for start in previous_state if start not in state]
+
+    socketio.emit('slots_delta', {
+        **scope,
+        'from_version': from_version,
+        'version': version,
+        'changes': [{'start_time': start, 'available': available} for start, available in changes]
+    }, to=room)
\ No newline at end of file
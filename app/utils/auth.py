@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from app.models.user import User
+from app.utils.rate_limit import KeyedRateLimiter, try_acquire_all
+from config import Config
+
+# user_id -> (loaded_at, user dict), least recently used first
+_users = OrderedDict()
+_lock = threading.Lock()
+
+_ip_limiter = None
+_email_limiter = None
+
+ROLE_ERRORS = {
+    'admin': 'Admin access required',
+    'provider': 'Provider access required',
+}
+
+
+def user_claims(user):
+    """Claims embedded in a user's access tokens, so views can authorize without a lookup"""
+    return {'role': user.role, 'is_active': bool(user.is_active)}
+
+
+def get_cached_user(user_id):
+    """
+    Get a user as a dict, from this worker's cache when fresh enough.
+
+    Entries live for USER_CACHE_TTL_SECONDS; code that changes a user calls
+    invalidate_cached_user() so this worker sees the change at once, but other
+    workers may serve the old entry until it expires. Only use it where that
+    is acceptable, such as role lookups for tokens without claims. Returns
+    None for unknown users.
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _users.get(user_id)
+        if cached and now - cached[0] < Config.USER_CACHE_TTL_SECONDS:
+            _users.move_to_end(user_id)
+            return cached[1]
+
+    user = User.query.get(user_id)
+    if not user:
+        return None
+    data = user.to_dict()
+
+    with _lock:
+        _users[user_id] = (now, data)
+        _users.move_to_end(user_id)
+        while len(_users) > Config.USER_CACHE_MAX_ENTRIES:
+            _users.popitem(last=False)
+    return data
+
+
+def invalidate_cached_user(user_id):
+    with _lock:
+        _users.pop(user_id, None)
+
+
+def current_identity():
+    """
+    Get (user_id, role, is_active) for the request's JWT.
+
+    Read from the token's claims; tokens issued before the claims existed
+    fall back to the user cache. role is None for a deleted user.
+    """
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+    if 'role' in claims:
+        return user_id, claims['role'], claims.get('is_active', True)
+
+    user = get_cached_user(user_id)
+    if not user:
+        return user_id, None, False
+    return user_id, user['role'], user['is_active']
+
+
+def role_required(*roles):
+    """
+    Restrict a view to users holding one of `roles`; goes under @jwt_required().
+
+    Role and active state come from the token, so a role change or
+    deactivation applies from the user's next token, at most
+    JWT_ACCESS_TOKEN_EXPIRES later.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            _, role, is_active = current_identity()
+            if role not in roles:
+                error = ROLE_ERRORS.get(roles[0], 'Access denied') if len(roles) == 1 else 'Access denied'
+                return jsonify({'error': error}), 403
+            if not is_active:
+                return jsonify({'error': 'Account is deactivated'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_auth_rate_limiters():
+    """Get the worker's (per-IP, per-email) limiters for login and register"""
+    global _ip_limiter, _email_limiter
+    if _ip_limiter is None:
+        _ip_limiter = KeyedRateLimiter(
+            Config.AUTH_IP_RATE_PER_MINUTE / 60, Config.AUTH_IP_BURST, Config.AUTH_RATE_LIMIT_MAX_KEYS
+        )
+        _email_limiter = KeyedRateLimiter(
+            Config.AUTH_EMAIL_RATE_PER_MINUTE / 60, Config.AUTH_EMAIL_BURST, Config.AUTH_RATE_LIMIT_MAX_KEYS
+        )
+    return _ip_limiter, _email_limiter
+
+
+def check_auth_rate_limit(action, client_ip, email):
+    """
+    Admit one login or register attempt.
+
+    Draws a token from the client IP's bucket and from the (action, email)
+    bucket, or from neither if either is empty; email must already be
+    normalized. Call it before looking the user up, so a rejected attempt
+    costs no query and no bcrypt work. Returns 0 when admitted, otherwise
+    whole seconds to wait.
+    """
+    ip_limiter, email_limiter = get_auth_rate_limiters()
+    buckets = []
+    if client_ip:
+        buckets.append((ip_limiter, client_ip))
+    if email:
+        buckets.append((email_limiter, f'{action}:{email}'))
+    _, wait = try_acquire_all(buckets)
+    return math.ceil(wait) if wait > 0 else 0
\ No newline at end of file
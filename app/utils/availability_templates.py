@@ -0,0 +1,158 @@
+import threading
+import time
+from datetime import date
+from flask import g
+from app import db
+from app.models.availability import Availability
+from app.utils.conflict_index import SHOP_LANE, bump_schedule_version, get_schedule_version
+from config import Config
+
+# The schedule_versions row counting availability changes in every worker;
+# no real booking day is this early
+TEMPLATE_VERSION_KEY = (SHOP_LANE, date.min)
+
+# provider_id -> (compiled_at, version, template); template is None when the
+# provider has no availability rows at all
+_templates = {}
+_lock = threading.Lock()
+
+
+def _to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def compile_weekly_template(rows):
+    """
+    Compile availability rows into a weekly template.
+
+    rows: iterable of (day_of_week, start_time, end_time, is_available)
+
+    Returns {day_of_week: [(start_minute, end_minute), ...]} with sorted,
+    merged intervals, or None when there are no rows. Weekdays without an
+    available row are closed.
+    """
+    rows = list(rows)
+    if not rows:
+        return None
+
+    by_day = {}
+    for day_of_week, start_time, end_time, is_available in rows:
+        if is_available:
+            by_day.setdefault(day_of_week, []).append(
+                (_to_minutes(start_time), _to_minutes(end_time))
+            )
+
+    template = {}
+    for day_of_week, intervals in by_day.items():
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        template[day_of_week] = tuple(merged)
+
+    return template
+
+
+def _template_version():
+    """
+    Get the shared availability version, read once per request.
+
+    Any worker's availability change bumps it, so a cached template
+    compiled under an older version is reloaded rather than trusted.
+    """
+    if 'availability_version' not in g:
+        g.availability_version = get_schedule_version(*TEMPLATE_VERSION_KEY)
+    return g.availability_version
+
+
+def _is_fresh(cached, now, version):
+    return (
+        cached is not None
+        and cached[1] == version
+        and now - cached[0] < Config.AVAILABILITY_TEMPLATE_TTL_SECONDS
+    )
+
+
+def get_provider_template(provider_id):
+    """Get a provider's compiled weekly template, loading it on a cache miss"""
+    now = time.monotonic()
+    version = _template_version()
+    cached = _templates.get(provider_id)
+    if _is_fresh(cached, now, version):
+        return cached[2]
+
+    rows = db.session.query(
+        Availability.day_of_week,
+        Availability.start_time,
+        Availability.end_time,
+        Availability.is_available
+    ).filter(Availability.provider_id == provider_id).all()
+
+    template = compile_weekly_template(rows)
+    with _lock:
+        _templates[provider_id] = (now, version, template)
+    return template
+
+
+def warm_provider_templates(provider_ids):
+    """Load the templates of every listed provider missing from the cache in one query"""
+    now = time.monotonic()
+    version = _template_version()
+    missing = [
+        provider_id for provider_id in provider_ids
+        if not _is_fresh(_templates.get(provider_id), now, version)
+    ]
+    if not missing:
+        return
+
+    rows_by_provider = {provider_id: [] for provider_id in missing}
+    rows = db.session.query(
+        Availability.provider_id,
+        Availability.day_of_week,
+        Availability.start_time,
+        Availability.end_time,
+        Availability.is_available
+    ).filter(Availability.provider_id.in_(missing)).all()
+    for row in rows:
+        rows_by_provider[row[0]].append(tuple(row[1:]))
+
+    with _lock:
+        for provider_id, provider_rows in rows_by_provider.items():
+            _templates[provider_id] = (now, version, compile_weekly_template(provider_rows))
+
+
+def invalidate_provider_template(provider_id):
+    """
+    Invalidate a provider's template in every worker; call it in the
+    transaction that changes their availability, before the commit.
+    """
+    bump_schedule_version(*TEMPLATE_VERSION_KEY)
+    g.pop('availability_version', None)
+    with _lock:
+        _templates.pop(provider_id, None)
+
+
+def get_open_intervals(provider_id, day):
+    """
+    Get the minute intervals a provider works on a day, clipped to business hours.
+
+    Returns None when the provider has no availability schedule, in which
+    case plain business hours apply.
+    """
+    if not provider_id:
+        return None
+
+    template = get_provider_template(provider_id)
+    if template is None:
+        return None
+
+    open_start = Config.BUSINESS_HOURS_START * 60
+    open_end = Config.BUSINESS_HOURS_END * 60
+
+    return [
+        (max(start, open_start), min(end, open_end))
+        for start, end in template.get(day.weekday(), ())
+        if start < open_end and end > open_start
+    ]
\ No newline at end of file
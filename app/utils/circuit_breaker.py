@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from flask import g, has_app_context
+from config import Config
+
+
+class DeliveryDeferred(Exception):
+    """A message was not attempted and should be retried later"""
+
+
+class CircuitOpenError(DeliveryDeferred):
+    """The transport's circuit is open, so calls are refused without trying"""
+
+
+class DeadlineExceeded(DeliveryDeferred):
+    """The caller's time budget ran out before the call could start"""
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for one upstream service.
+
+    Closed: calls go through and their outcomes fill a sliding window. Once
+    the window holds at least `min_calls` outcomes and the failure rate
+    reaches `failure_rate`, the circuit opens.
+
+    Open: calls are refused with CircuitOpenError until `reset_seconds`
+    have passed, then the circuit goes half-open.
+
+    Half-open: a single probe call is let through. Success closes the
+    circuit with a fresh window; failure opens it again.
+    """
+
+    def __init__(self, name, failure_rate=None, window_size=None, min_calls=None, reset_seconds=None):
+        self.name = name
+        self.failure_rate = failure_rate or Config.BREAKER_FAILURE_RATE
+        self.min_calls = min_calls or Config.BREAKER_MIN_CALLS
+        self.reset_seconds = reset_seconds or Config.BREAKER_RESET_SECONDS
+        self._outcomes = deque(maxlen=window_size or Config.BREAKER_WINDOW_SIZE)
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.opened_at = None
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    def before_call(self):
+        """Reserve a call, raising CircuitOpenError if the circuit refuses it"""
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError(f'{self.name} circuit is open')
+                self.state = 'half_open'
+
+            if self.state == 'half_open':
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(f'{self.name} circuit is half-open')
+                self._probe_in_flight = True
+
+    def record(self, success):
+        """Record the outcome of a call reserved with before_call()"""
+        with self._lock:
+            if self.state == 'half_open':
+                self._probe_in_flight = False
+                if success:
+                    self.state = 'closed'
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(success)
+            if self.state == 'closed' and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def is_open(self):
+        """Check if calls would be refused right now, without reserving one"""
+        with self._lock:
+            if self.state == 'open':
+                return time.monotonic() - self.opened_at < self.reset_seconds
+            return self.state == 'half_open' and self._probe_in_flight
+
+    def retry_after(self):
+        """Seconds until an open circuit lets a probe through"""
+        with self._lock:
+            if self.state != 'open':
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def _open(self):
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def to_dict(self):
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                'state': self.state,
+                'failure_rate': round(self._outcomes.count(False) / calls, 3) if calls else 0.0,
+                'window_calls': calls,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened
+            }
+
+
+def start_request_budget():
+    """Give the current request its notification time budget (before_request hook)"""
+    g.notification_deadline = time.monotonic() + Config.NOTIFICATION_REQUEST_BUDGET_SECONDS
+
+
+@contextmanager
+def deadline_budget(seconds):
+    """Limit the notification calls made inside the block to `seconds` in total"""
+    previous = g.get('notification_deadline')
+    deadline = time.monotonic() + seconds
+    # A nested budget can only shorten the enclosing one
+    g.notification_deadline = min(deadline, previous) if previous else deadline
+    try:
+        yield
+    finally:
+        g.notification_deadline = previous
+
+
+def remaining_budget():
+    """Seconds left in the current budget, or None outside of one"""
+    if not has_app_context():
+        return None
+    deadline = g.get('notification_deadline')
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_timeout(default):
+    """
+    Get the timeout for the next upstream call.
+
+    This is the transport's own timeout, shortened to whatever remains of
+    the current budget. Raises DeadlineExceeded when the budget is spent.
+    """
+    remaining = remaining_budget()
+    if remaining is None:
+        return default
+    if remaining <= 0:
+        raise DeadlineExceeded('Notification time budget exhausted')
+    return min(default, remaining)
\ No newline at end of file
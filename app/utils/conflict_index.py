@@ -0,0 +1,197 @@
+import bisect
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app import db
+from app.models.appointment import Appointment
+from app.models.schedule_version import ScheduleVersion
+from config import Config
+
+SHOP_LANE = 0  # Version lane bumped by every booking change, covering the whole shop
+
+# (lane, day) -> IntervalIndex, least recently used first
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def lane_for(provider_id):
+    """Get the version lane for a provider, or the shop lane when unassigned"""
+    return int(provider_id) if provider_id else SHOP_LANE
+
+
+class IntervalIndex:
+    """
+    Booked intervals of one lane-day, sorted by start.
+
+    Alongside the sorted starts it keeps a running maximum of end times, so
+    "does anything overlap [start, end)" is one bisect plus one lookup even
+    when intervals overlap each other, as they do in the shop lane.
+    """
+
+    def __init__(self, version, bookings):
+        self.version = version
+        self._entries = sorted(bookings)  # (start, end, appointment_id)
+        self._reindex()
+
+    def overlaps(self, start, end):
+        """Check if any booked interval overlaps [start, end)"""
+        count = bisect.bisect_left(self._starts, end)
+        return count > 0 and self._max_ends[count - 1] > start
+
+    def add(self, start, end, appointment_id):
+        bisect.insort(self._entries, (start, end, appointment_id))
+        self._reindex()
+
+    def remove(self, appointment_id):
+        self._entries = [entry for entry in self._entries if entry[2] != appointment_id]
+        self._reindex()
+
+    def _reindex(self):
+        self._starts = [entry[0] for entry in self._entries]
+        self._max_ends = []
+        latest_end = None
+        for entry in self._entries:
+            latest_end = entry[1] if latest_end is None else max(latest_end, entry[1])
+            self._max_ends.append(latest_end)
+
+
+def get_schedule_version(lane, day):
+    """Get the committed schedule version of a lane-day"""
+    version = db.session.query(ScheduleVersion.version).filter_by(lane=lane, day=day).scalar()
+    return version or 0
+
+
+def find_cached_conflict(provider_id, start_time, end_time):
+    """
+    Check for a conflict using this worker's interval index.
+
+    Loads the lane-day into the index on first use. Returns None when the
+    cached copy is older than the database's version stamp, meaning another
+    worker changed the schedule; the caller must fall back to the SQL check.
+    """
+    lane = lane_for(provider_id)
+    day = start_time.date()
+    key = (lane, day)
+
+    # Read the version before loading so a concurrent write can only make
+    # the cached copy look stale, never fresh
+    version = get_schedule_version(lane, day)
+
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            if index.version != version:
+                del _indexes[key]
+                return None
+            return index.overlaps(start_time, end_time)
+
+    index = IntervalIndex(version, _load_bookings(provider_id, day))
+    with _lock:
+        _indexes[key] = index
+        while len(_indexes) > Config.CONFLICT_INDEX_MAX_DAYS:
+            _indexes.popitem(last=False)
+        return index.overlaps(start_time, end_time)
+
+
+def _load_bookings(provider_id, day):
+    day_start = datetime.combine(day, datetime.min.time())
+    query = db.session.query(Appointment.start_time, Appointment.end_time, Appointment.id).filter(
+        Appointment.status.in_(Appointment.ACTIVE_STATUSES),
+        Appointment.start_time < day_start + timedelta(days=1),
+        Appointment.end_time > day_start
+    )
+    if provider_id:
+        query = query.filter(Appointment.provider_id == provider_id)
+    return [tuple(row) for row in query.all()]
+
+
+def _schedule_footprint(appointment):
+    """Get (provider_id, start_time, end_time) if the appointment occupies the schedule"""
+    if appointment.status not in Appointment.ACTIVE_STATUSES:
+        return None
+    return (appointment.provider_id, appointment.start_time, appointment.end_time)
+
+
+def _footprint_keys(footprint):
+    if footprint is None:
+        return set()
+    day = footprint[1].date()
+    return {(lane_for(footprint[0]), day), (SHOP_LANE, day)}
+
+
+def bump_schedule_version(lane, day):
+    """Increment a lane-day version inside the current transaction and return it"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql_insert if dialect == 'postgresql' else sqlite_insert
+        statement = insert(ScheduleVersion).values(
+            lane=lane, day=day, version=1, updated_at=datetime.utcnow()
+        ).on_conflict_do_update(
+            index_elements=['lane', 'day'],
+            set_={'version': ScheduleVersion.version + 1, 'updated_at': datetime.utcnow()}
+        )
+        db.session.execute(statement)
+    else:
+        row = ScheduleVersion.query.filter_by(lane=lane, day=day).with_for_update().first()
+        if row:
+            row.version += 1
+        else:
+            db.session.add(ScheduleVersion(lane=lane, day=day, version=1))
+        db.session.flush()
+
+    return get_schedule_version(lane, day)
+
+
+class ScheduleChange:
+    """
+    Tracks how one appointment write moves it on the schedule.
+
+    Create it before changing the appointment, call stage() before the
+    commit to bump the version stamps in the same transaction, and apply()
+    after the commit to bring this worker's index up to date:
+
+        change = ScheduleChange(appointment)
+        appointment.status = 'cancelled'
+        change.stage()
+        db.session.commit()
+        change.apply()
+    """
+
+    def __init__(self, appointment):
+        self.appointment = appointment
+        self.before = _schedule_footprint(appointment) if appointment.id else None
+        self.after = None
+        self.appointment_id = None
+        self.versions = {}
+
+    def stage(self):
+        """Bump the version of every lane-day the write touches"""
+        db.session.flush()
+        self.appointment_id = self.appointment.id
+        self.after = _schedule_footprint(self.appointment)
+        if self.after == self.before:
+            return
+
+        # Bump in a fixed order so concurrent writers lock rows consistently
+        for lane, day in sorted(_footprint_keys(self.before) | _footprint_keys(self.after)):
+            self.versions[(lane, day)] = bump_schedule_version(lane, day)
+
+    def apply(self):
+        """Apply the committed write to this worker's index"""
+        after_keys = _footprint_keys(self.after)
+        with _lock:
+            for key, version in self.versions.items():
+                index = _indexes.get(key)
+                if index is None:
+                    continue
+                if index.version != version - 1:
+                    # Another worker wrote in between; reload on next use
+                    del _indexes[key]
+                    continue
+                index.remove(self.appointment_id)
+                if key in after_keys:
+                    index.add(self.after[1], self.after[2], self.appointment_id)
+                index.version = version
\ No newline at end of file
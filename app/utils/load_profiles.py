@@ -0,0 +1,28 @@
+from sqlalchemy.orm import joinedload, selectinload
+from app.models.appointment import Appointment
+
+# Loader options matching the relations each serializer touches. List
+# profiles use one SELECT ... IN per relation so the query count stays flat
+# however many rows a page holds; detail profiles join everything into the
+# single-row query.
+LOAD_PROFILES = {
+    # Appointment.to_dict(include_relations=True) over many rows
+    'appointment_list': (
+        selectinload(Appointment.customer),
+        selectinload(Appointment.provider),
+        selectinload(Appointment.service),
+        selectinload(Appointment.vehicle),
+    ),
+    # Appointment.to_dict(include_relations=True) for one row
+    'appointment_detail': (
+        joinedload(Appointment.customer),
+        joinedload(Appointment.provider),
+        joinedload(Appointment.service),
+        joinedload(Appointment.vehicle),
+    ),
+}
+
+
+def with_load_profile(query, profile):
+    """Attach a named load profile's eager-loading options to a query"""
+    return query.options(*LOAD_PROFILES[profile])
\ No newline at end of file
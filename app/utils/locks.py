@@ -0,0 +1,43 @@
+import threading
+import weakref
+from contextlib import contextmanager
+from sqlalchemy import text
+from app import db
+
+# Process-local fallback locks for databases without advisory locks. Weak
+# values let entries for provider-days nobody is booking get collected.
+_local_locks = weakref.WeakValueDictionary()
+_local_locks_guard = threading.Lock()
+
+
+def _get_local_lock(key):
+    with _local_locks_guard:
+        lock = _local_locks.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _local_locks[key] = lock
+        return lock
+
+
+@contextmanager
+def provider_day_lock(provider_id, day):
+    """
+    Serialize bookings for a provider-day.
+
+    On PostgreSQL this takes a transaction-scoped advisory lock, which is
+    held until the current transaction commits or rolls back, so the block
+    must include the commit. Other databases (e.g. SQLite in development and
+    tests) fall back to a lock shared by the threads of this process.
+    """
+    lane = int(provider_id) if provider_id else 0
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(
+            text('SELECT pg_advisory_xact_lock(:lane, :day)'),
+            {'lane': lane, 'day': day.toordinal()}
+        )
+        yield
+        return
+
+    with _get_local_lock((lane, day.toordinal())):
+        yield
\ No newline at end of file
@@ -1,48 +1,18 @@
-import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from twilio.rest import Client
-from config import Config
+from app.utils.transports import get_transport, render_substitutions
 
 def send_email(to_email, subject, html_content):
-    """Send email using SendGrid"""
+    """Send email through the worker's shared email transport"""
     try:
-        if not Config.SENDGRID_API_KEY:
-            print("SendGrid API key not configured")
-            return False
-        
-        message = Mail(
-            from_email=Config.SENDGRID_FROM_EMAIL,
-            to_emails=to_email,
-            subject=subject,
-            html_content=html_content
-        )
-        
-        sg = SendGridAPIClient(Config.SENDGRID_API_KEY)
-        response = sg.send(message)
-        
-        return response.status_code == 202
+        return get_transport('email').send(to_email, subject, html_content)
         
     except Exception as e:
         print(f"Email sending failed: {str(e)}")
         return False
 
 def send_sms(to_phone, message):
-    """Send SMS using Twilio"""
+    """Send SMS through the worker's shared SMS transport"""
     try:
-        if not all([Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN]):
-            print("Twilio credentials not configured")
-            return False
-        
-        client = Client(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN)
-        
-        message = client.messages.create(
-            body=message,
-            from_=Config.TWILIO_PHONE_NUMBER,
-            to=to_phone
-        )
-        
-        return message.sid is not None
+        return get_transport('sms').send(to_phone, None, message)
         
     except Exception as e:
         print(f"SMS sending failed: {str(e)}")
@@ -84,14 +54,10 @@ def send_appointment_confirmation(email, appointment_data):
     
     return send_email(email, subject, html_content)
 
-def send_appointment_reminder(email, appointment_data):
-    """Send appointment reminder email"""
-    subject = "Appointment Reminder - AutoBook"
-    
-    service = appointment_data.get('service', {})
-    start_time = appointment_data.get('start_time', '')
-    
-    html_content = f"""
+# Reminder email with SendGrid-style substitution tokens, so one body can be
+# sent to many recipients in a single batch request
+APPOINTMENT_REMINDER_SUBJECT = "Appointment Reminder - AutoBook"
+APPOINTMENT_REMINDER_HTML = """
     <html>
         <body style="font-family: Arial, sans-serif; color: #333;">
             <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
@@ -99,8 +65,8 @@ def send_appointment_reminder(email, appointment_data):
                 <p>This is a reminder about your upcoming appointment.</p>
                 
                 <div style="background-color: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                    <p><strong>Service:</strong> {service.get('name', 'N/A')}</p>
-                    <p><strong>Date & Time:</strong> {start_time}</p>
+                    <p><strong>Service:</strong> -service_name-</p>
+                    <p><strong>Date & Time:</strong> -start_time-</p>
                 </div>
                 
                 <p>We look forward to seeing you!</p>
@@ -108,8 +74,36 @@ def send_appointment_reminder(email, appointment_data):
         </body>
     </html>
     """
+
+def _reminder_substitutions(appointment_data):
+    service = appointment_data.get('service') or {}
+    return {
+        '-service_name-': service.get('name', 'N/A'),
+        '-start_time-': appointment_data.get('start_time', '')
+    }
+
+def send_appointment_reminder(email, appointment_data):
+    """Send appointment reminder email"""
+    html_content = render_substitutions(APPOINTMENT_REMINDER_HTML, _reminder_substitutions(appointment_data))
     
-    return send_email(email, subject, html_content)
+    return send_email(email, APPOINTMENT_REMINDER_SUBJECT, html_content)
+
+def send_appointment_reminders(reminders):
+    """
+    Send reminder emails in batches.
+    
+    reminders: list of (email, appointment_data). Returns a success flag per reminder.
+    """
+    try:
+        return get_transport('email').send_batch(
+            APPOINTMENT_REMINDER_SUBJECT,
+            APPOINTMENT_REMINDER_HTML,
+            [(email, _reminder_substitutions(data)) for email, data in reminders]
+        )
+        
+    except Exception as e:
+        print(f"Batch reminder sending failed: {str(e)}")
+        return [False] * len(reminders)
 
 def send_cancellation_notification(email, appointment_data):
     """Send appointment cancellation email"""
@@ -0,0 +1,182 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app import db
+from app.models.notification_outbox import NotificationOutbox
+from app.utils.circuit_breaker import deadline_budget, remaining_budget
+from app.utils.notifications import (
+    send_appointment_confirmation,
+    send_appointment_sms,
+    send_cancellation_notification,
+    send_cancellation_sms,
+    send_status_update_sms
+)
+from app.utils.transports import get_transport
+from config import Config
+
+# Outbox kinds and the sender that delivers each one as sender(recipient, payload)
+NOTIFICATION_SENDERS = {
+    'appointment_confirmation': send_appointment_confirmation,
+    'appointment_sms': send_appointment_sms,
+    'cancellation_notification': send_cancellation_notification,
+    'cancellation_sms': send_cancellation_sms,
+    'status_update_sms': lambda phone, payload: send_status_update_sms(phone, payload, payload.get('status')),
+}
+
+# The transport channel each kind is delivered over
+NOTIFICATION_CHANNELS = {
+    'appointment_confirmation': 'email',
+    'appointment_sms': 'sms',
+    'cancellation_notification': 'email',
+    'cancellation_sms': 'sms',
+    'status_update_sms': 'sms',
+}
+
+# Kinds that report the appointment's latest state. Within a group a newer
+# message replaces any still pending for the same recipient and appointment,
+# so a burst of status changes sends only the final one.
+COALESCE_GROUPS = {
+    'status_update_sms': 'status_sms',
+    'cancellation_sms': 'status_sms',
+    'cancellation_notification': 'status_email',
+}
+
+
+def _content_hash(kind, recipient, payload):
+    content = json.dumps([kind, recipient, payload], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def enqueue_notification(kind, recipient, payload, appointment_id=None):
+    """
+    Queue a notification in the current transaction.
+
+    Nothing is sent here; the row commits or rolls back together with the
+    change that caused it, and the dispatcher delivers it afterwards.
+
+    With an appointment_id the message is deduplicated: if the latest
+    message for the same recipient and appointment has identical content
+    and was queued within NOTIFICATION_DEDUP_WINDOW_SECONDS, that row is
+    returned instead of queueing a new one. Kinds in COALESCE_GROUPS are
+    also held back for NOTIFICATION_COALESCE_WINDOW_SECONDS and supersede
+    pending messages of their group.
+    """
+    if kind not in NOTIFICATION_SENDERS:
+        raise ValueError(f'Unknown notification kind: {kind}')
+
+    now = datetime.utcnow()
+    group = COALESCE_GROUPS.get(kind)
+    content_hash = _content_hash(kind, recipient, payload)
+    coalesce_key = None
+    available_at = now
+
+    if appointment_id is not None:
+        coalesce_key = f'{group or kind}:{recipient}:{appointment_id}'
+
+        latest = NotificationOutbox.query.filter(
+            NotificationOutbox.coalesce_key == coalesce_key,
+            NotificationOutbox.status.in_(('pending', 'sent'))
+        ).order_by(NotificationOutbox.id.desc()).first()
+
+        dedup_since = now - timedelta(seconds=Config.NOTIFICATION_DEDUP_WINDOW_SECONDS)
+        if latest and latest.content_hash == content_hash and latest.created_at >= dedup_since:
+            return latest
+
+        if group:
+            NotificationOutbox.query.filter(
+                NotificationOutbox.coalesce_key == coalesce_key,
+                NotificationOutbox.status == 'pending'
+            ).update({'status': 'superseded'}, synchronize_session=False)
+            available_at = now + timedelta(seconds=Config.NOTIFICATION_COALESCE_WINDOW_SECONDS)
+
+    entry = NotificationOutbox(
+        kind=kind,
+        recipient=recipient,
+        payload=payload,
+        appointment_id=appointment_id,
+        coalesce_key=coalesce_key,
+        content_hash=content_hash,
+        available_at=available_at,
+        created_at=now
+    )
+    db.session.add(entry)
+    return entry
+
+
+def dispatch_pending(batch_size=None):
+    """
+    Deliver one batch of due notifications.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED where the database supports
+    it, so several dispatchers can drain the outbox side by side. Failed
+    sends are retried with exponential backoff up to OUTBOX_MAX_ATTEMPTS.
+
+    Rows whose transport circuit is open, or that are reached after the
+    batch has spent OUTBOX_BATCH_BUDGET_SECONDS, are deferred without
+    being attempted, so an upstream outage does not use up their retries.
+
+    Returns (sent, failed, deferred) counts for the batch.
+    """
+    now = datetime.utcnow()
+    entries = NotificationOutbox.query.filter(
+        NotificationOutbox.status == 'pending',
+        NotificationOutbox.available_at <= now
+    ).order_by(NotificationOutbox.available_at, NotificationOutbox.id).limit(
+        batch_size or Config.OUTBOX_BATCH_SIZE
+    ).with_for_update(skip_locked=True).all()
+
+    # Two writers can race past the supersede step in enqueue_notification,
+    # so only the newest pending message of a coalescing group goes out
+    coalesce_keys = {
+        entry.coalesce_key for entry in entries
+        if entry.coalesce_key and entry.kind in COALESCE_GROUPS
+    }
+    latest_ids = {}
+    if coalesce_keys:
+        latest_ids = dict(db.session.query(
+            NotificationOutbox.coalesce_key, func.max(NotificationOutbox.id)
+        ).filter(
+            NotificationOutbox.coalesce_key.in_(coalesce_keys),
+            NotificationOutbox.status == 'pending'
+        ).group_by(NotificationOutbox.coalesce_key).all())
+
+    sent = failed = deferred = 0
+    with deadline_budget(Config.OUTBOX_BATCH_BUDGET_SECONDS):
+        for entry in entries:
+            if latest_ids.get(entry.coalesce_key, entry.id) != entry.id:
+                entry.status = 'superseded'
+                continue
+
+            transport = get_transport(NOTIFICATION_CHANNELS[entry.kind])
+            remaining = remaining_budget()
+            if transport.breaker.is_open() or (remaining is not None and remaining <= 0):
+                entry.available_at = datetime.utcnow() + timedelta(seconds=transport.breaker.retry_after())
+                deferred += 1
+                continue
+
+            entry.attempts += 1
+            try:
+                delivered = NOTIFICATION_SENDERS[entry.kind](entry.recipient, entry.payload)
+                error = None if delivered else 'Transport reported failure'
+            except Exception as e:
+                delivered = False
+                error = str(e)
+
+            if delivered:
+                entry.status = 'sent'
+                entry.sent_at = datetime.utcnow()
+                entry.last_error = None
+                sent += 1
+                continue
+
+            entry.last_error = error
+            failed += 1
+            if entry.attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+                entry.status = 'failed'
+            else:
+                backoff = Config.OUTBOX_RETRY_BASE_SECONDS * 2 ** (entry.attempts - 1)
+                entry.available_at = datetime.utcnow() + timedelta(seconds=backoff)
+
+    db.session.commit()
+    return sent, failed, deferred
\ No newline at end of file
@@ -0,0 +1,19 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(start_time, record_id):
+    """Encode a (start_time, id) keyset position as an opaque cursor"""
+    raw = json.dumps([start_time.isoformat(), record_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor back into (start_time, id); raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        start_time, record_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(start_time), int(record_id)
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
\ No newline at end of file
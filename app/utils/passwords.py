@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from config import Config
+
+# Latency samples kept for the percentiles in get_password_pool_stats()
+SAMPLE_WINDOW = 1000
+
+
+class PasswordPoolStats:
+    """Queue depth and latency of password hashing in this worker"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self._waits = deque(maxlen=SAMPLE_WINDOW)
+        self._totals = deque(maxlen=SAMPLE_WINDOW)
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.in_flight - self.workers)
+
+    def leave(self, wait, total):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self._waits.append(wait)
+            self._totals.append(total)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'in_flight': self.in_flight,
+                'queue_depth': max(0, self.in_flight - self.workers),
+                'max_queue_depth': self.max_queue_depth,
+                'completed': self.completed,
+                'wait_ms': _percentiles(self._waits),
+                'latency_ms': _percentiles(self._totals)
+            }
+
+
+def _percentiles(samples):
+    if not samples:
+        return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        'p50': round(1000 * pick(0.5), 2),
+        'p99': round(1000 * pick(0.99), 2),
+        'max': round(1000 * ordered[-1], 2)
+    }
+
+
+_workers = Config.PASSWORD_HASH_WORKERS
+_slots = threading.BoundedSemaphore(_workers)
+_stats = PasswordPoolStats(_workers)
+
+
+def _green_runtime():
+    """
+    Get the green library this process is monkey patched with, if any.
+
+    Decided by the running process rather than SOCKETIO_ASYNC_MODE: CLI
+    commands and scripts load the same config but are never patched, and
+    handing work to a hub that isn't running never returns.
+    """
+    if 'eventlet' in sys.modules:
+        from eventlet import patcher
+        if patcher.is_monkey_patched('thread'):
+            return 'eventlet'
+    if 'gevent' in sys.modules:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            return 'gevent'
+    return None
+
+
+def _offload(func, *args):
+    """
+    Run a bcrypt call on a native thread, at most PASSWORD_HASH_WORKERS at a time.
+
+    bcrypt releases the GIL while it works. In a process monkey patched
+    for eventlet/gevent a plain call would still hold the hub for the
+    whole hash, so it goes to the hub's native thread pool and only this
+    greenlet waits. Anywhere else the caller already is a native thread
+    and bcrypt runs inline. Callers beyond the limit queue on the
+    semaphore, which is green under monkey patching.
+    """
+    queued_at = time.monotonic()
+    started_at = None
+    _stats.enter()
+    try:
+        with _slots:
+            started_at = time.monotonic()
+            runtime = _green_runtime()
+            if runtime == 'eventlet':
+                from eventlet import tpool
+                result = tpool.execute(func, *args)
+            elif runtime == 'gevent':
+                import gevent
+                result = gevent.get_hub().threadpool.apply(func, args)
+            else:
+                result = func(*args)
+    finally:
+        finished_at = time.monotonic()
+        _stats.leave((started_at or finished_at) - queued_at, finished_at - queued_at)
+    return result
+
+
+def hash_password(password):
+    """Hash a password with BCRYPT_LOG_ROUNDS; returns the hash as text"""
+    salt = bcrypt.gensalt(rounds=Config.BCRYPT_LOG_ROUNDS)
+    return _offload(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(password, password_hash):
+    """Check a password against a stored hash, whatever cost it was made with"""
+    return _offload(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def hash_passwords(passwords):
+    """
+    Hash many passwords at once, spread over PASSWORD_HASH_WORKERS threads.
+
+    Each hash still goes through _offload() and counts against the same
+    limit as logins. In a plain process, such as the import-users CLI
+    command, the executor's native threads hash directly; under monkey
+    patching they are greenlets that wait on the hub's thread pool.
+    Returns the hashes in input order.
+    """
+    with ThreadPoolExecutor(max_workers=_workers) as executor:
+        return list(executor.map(hash_password, passwords))
+
+
+def get_password_pool_stats():
+    return _stats.to_dict()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` operations per second with bursts up to `capacity`.
+
+    Safe to share between threads; every caller draws from the same bucket.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens if available without waiting.
+
+        Returns (acquired, wait_seconds) where wait_seconds is how long until
+        enough tokens will have accumulated.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True, 0.0
+            return False, (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Take tokens, sleeping until they are available"""
+        while True:
+            acquired, wait = self.try_acquire(tokens)
+            if acquired:
+                return
+            time.sleep(wait)
+
+
+class KeyedRateLimiter:
+    """
+    One token bucket per key, e.g. per client IP or per account.
+
+    Buckets are (tokens, updated) pairs in an LRU map capped at `max_keys`,
+    so memory stays bounded however many distinct keys arrive. An evicted
+    key comes back with a full bucket, which is what an idle key would
+    have refilled to anyway unless the cap is far too small.
+    """
+
+    def __init__(self, rate, capacity, max_keys):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.evicted = 0
+
+    def try_acquire(self, key, tokens=1):
+        """Take tokens from key's bucket; returns (acquired, wait_seconds)"""
+        with self._lock:
+            now = time.monotonic()
+            available = self._available(key, now)
+            if available >= tokens:
+                self._store(key, available - tokens, now)
+                return True, 0.0
+            self._store(key, available, now)
+            self.rejected += 1
+            return False, (tokens - available) / self.rate
+
+    def _available(self, key, now):
+        """Tokens in key's bucket at `now`; the caller holds the lock"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.capacity
+        self._buckets.move_to_end(key)
+        return min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+
+    def _store(self, key, available, now):
+        """Save key's bucket and evict past max_keys; the caller holds the lock"""
+        self._buckets[key] = (available, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evicted += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {'keys': len(self._buckets), 'rejected': self.rejected, 'evicted': self.evicted}
+
+
+def try_acquire_all(buckets, tokens=1):
+    """
+    Take tokens from several keyed buckets, or from none of them.
+
+    buckets is a list of (KeyedRateLimiter, key). Every bucket is checked
+    before any is debited, so an attempt one bucket rejects costs the
+    others nothing; each limiter that came up short counts a rejection.
+    Returns (acquired, wait_seconds) with the longest wait.
+    """
+    # Locks are always taken in the same order, so callers can't deadlock
+    limiters = sorted({id(limiter): limiter for limiter, _ in buckets}.values(), key=id)
+    for limiter in limiters:
+        limiter._lock.acquire()
+    try:
+        now = time.monotonic()
+        available = [limiter._available(key, now) for limiter, key in buckets]
+        wait = 0.0
+        for (limiter, _), tokens_left in zip(buckets, available):
+            if tokens_left < tokens:
+                wait = max(wait, (tokens - tokens_left) / limiter.rate)
+
+        for (limiter, key), tokens_left in zip(buckets, available):
+            if wait:
+                limiter._store(key, tokens_left, now)
+                if tokens_left < tokens:
+                    limiter.rejected += 1
+            else:
+                limiter._store(key, tokens_left - tokens, now)
+        return not wait, wait
+    finally:
+        for limiter in reversed(limiters):
+            limiter._lock.release()
\ No newline at end of file
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.appointment import Appointment
+from app.utils.load_profiles import with_load_profile
+from app.utils.notifications import send_appointment_reminders, send_reminder_sms
+from app.utils.rate_limit import TokenBucket
+from app.utils.transports import get_transport
+from config import Config
+
+# Statuses that still get a reminder; in_progress appointments have already begun
+REMINDER_STATUSES = ('pending', 'confirmed')
+
+_sms_bucket = None
+
+
+def get_sms_bucket():
+    """Get the worker's shared SMS token bucket"""
+    global _sms_bucket
+    if _sms_bucket is None:
+        _sms_bucket = TokenBucket(Config.SMS_RATE_PER_SECOND, Config.SMS_BURST)
+    return _sms_bucket
+
+
+def claim_due_reminders(hours_ahead=None, batch_size=None):
+    """
+    Claim one batch of appointments starting within the next hours_ahead hours.
+
+    The range scan runs on ix_appointments_reminder_due. Claimed rows are
+    stamped with reminder_sent_at and committed before anything is sent, so
+    a second scheduler (or the next run) never picks them up again. Rows
+    are locked with FOR UPDATE SKIP LOCKED where supported so concurrent
+    schedulers split the work instead of waiting on each other.
+
+    Returns a list of (appointment_id, appointment_data).
+    """
+    now = datetime.utcnow()
+    horizon = now + timedelta(hours=hours_ahead or Config.REMINDER_HOURS_AHEAD)
+
+    appointments = with_load_profile(Appointment.query, 'appointment_list').filter(
+        Appointment.reminder_sent_at.is_(None),
+        Appointment.start_time > now,
+        Appointment.start_time <= horizon,
+        Appointment.status.in_(REMINDER_STATUSES)
+    ).order_by(Appointment.start_time, Appointment.id).limit(
+        batch_size or Config.REMINDER_BATCH_SIZE
+    ).with_for_update(skip_locked=True).all()
+
+    claimed = []
+    for appointment in appointments:
+        appointment.reminder_sent_at = now
+        claimed.append((appointment.id, appointment.to_dict(include_relations=True)))
+
+    db.session.commit()
+    return claimed
+
+
+def send_due_reminders(hours_ahead=None, batch_size=None):
+    """
+    Claim and send one batch of reminders.
+
+    Emails go out through the transport's batch send; SMS are paced by the
+    shared token bucket. An appointment whose every reminder failed is
+    released so the next run retries it; one that reached the customer on
+    any channel stays marked, so nothing is sent twice.
+
+    Returns (claimed, emails_sent, sms_sent).
+    """
+    claimed = claim_due_reminders(hours_ahead, batch_size)
+    if not claimed:
+        return 0, 0, 0
+
+    delivered = set()
+
+    email_reminders = [
+        (appointment_id, data) for appointment_id, data in claimed
+        if (data.get('customer') or {}).get('email')
+    ]
+    email_results = send_appointment_reminders(
+        [(data['customer']['email'], data) for _, data in email_reminders]
+    )
+    for (appointment_id, _), success in zip(email_reminders, email_results):
+        if success:
+            delivered.add(appointment_id)
+    emails_sent = sum(1 for success in email_results if success)
+
+    sms_sent = 0
+    bucket = get_sms_bucket()
+    sms_breaker = get_transport('sms').breaker
+    for appointment_id, data in claimed:
+        phone = (data.get('customer') or {}).get('phone')
+        if not phone:
+            continue
+        if sms_breaker.is_open():
+            # Twilio is down; undelivered reminders are released below
+            break
+        bucket.acquire()
+        if send_reminder_sms(phone, data):
+            delivered.add(appointment_id)
+            sms_sent += 1
+
+    failed_ids = [appointment_id for appointment_id, _ in claimed if appointment_id not in delivered]
+    if failed_ids:
+        Appointment.query.filter(Appointment.id.in_(failed_ids)).update(
+            {'reminder_sent_at': None}, synchronize_session=False
+        )
+        db.session.commit()
+
+    return len(claimed), emails_sent, sms_sent
\ No newline at end of file
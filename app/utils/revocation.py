@@ -0,0 +1,91 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.revoked_token import RevokedToken
+from config import Config
+
+# jti -> expiry (unix time) of every revoked token that hasn't expired yet
+_revoked = {}
+_lock = threading.Lock()
+_next_sync = 0.0  # time.monotonic() at which the store is next refreshed
+_synced_through = None  # revoked_at up to which the table has been read
+
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """
+    Check a decoded token against the revocation store (token_in_blocklist_loader).
+
+    A dict lookup in this worker's copy of the revoked JTIs. The copy is
+    refreshed from the revoked_tokens table at most once every
+    REVOCATION_SYNC_SECONDS, so most checks run no query at all.
+    """
+    if time.monotonic() >= _next_sync:
+        sync_revocations()
+    return jwt_payload['jti'] in _revoked
+
+
+def revoke_token(jwt_payload):
+    """
+    Revoke a decoded token and commit.
+
+    Takes effect in this worker at once and in the others within
+    REVOCATION_SYNC_SECONDS. Revoking a token twice is a no-op.
+    """
+    jti = jwt_payload['jti']
+    db.session.add(RevokedToken(
+        jti=jti,
+        token_type=jwt_payload['type'],
+        user_id=jwt_payload['sub'],
+        expires_at=datetime.utcfromtimestamp(jwt_payload['exp'])
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # Already revoked, possibly by another worker
+    _revoked[jti] = jwt_payload['exp']
+
+
+def sync_revocations():
+    """
+    Pull revocations made by other workers into this worker's store.
+
+    The first sync loads every unexpired revocation; later ones read only
+    rows revoked since the previous sync, reaching back a little further
+    so a row whose transaction committed late is not missed. Expired
+    entries are dropped as well.
+    """
+    global _next_sync, _synced_through
+    # One thread syncs while the others keep answering from the store
+    if not _lock.acquire(blocking=False):
+        return
+    try:
+        started = datetime.utcnow()
+        query = db.session.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+            RevokedToken.expires_at > started
+        )
+        if _synced_through is not None:
+            query = query.filter(
+                RevokedToken.revoked_at >= _synced_through - timedelta(seconds=Config.REVOCATION_SYNC_OVERLAP_SECONDS)
+            )
+        for jti, expires_at in query.all():
+            _revoked[jti] = (expires_at - datetime(1970, 1, 1)).total_seconds()
+
+        now = time.time()
+        for jti in [jti for jti, expires in list(_revoked.items()) if expires <= now]:
+            _revoked.pop(jti, None)
+
+        _synced_through = started
+        _next_sync = time.monotonic() + Config.REVOCATION_SYNC_SECONDS
+    finally:
+        _lock.release()
+
+
+def purge_expired_revocations():
+    """Delete revocations whose tokens have expired; returns the number removed"""
+    removed = RevokedToken.query.filter(
+        RevokedToken.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return removed
\ No newline at end of file
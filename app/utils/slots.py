@@ -0,0 +1,158 @@
+from datetime import datetime, time, timedelta
+from config import Config
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class DayOccupancy:
+    """
+    Occupancy of one provider-day as integer bitmaps.
+
+    The day is split into fixed units of `granularity` minutes; bit i of a
+    mask stands for unit i. open_mask marks working time and busy_mask marks
+    booked time, so free time is open_mask & ~busy_mask. Bookings are rounded
+    outwards to whole units and working time inwards, so rounding can only
+    make a slot look taken, never free.
+    """
+
+    def __init__(self, day, granularity=None):
+        self.granularity = granularity or Config.SLOT_GRANULARITY_MINUTES
+        if MINUTES_PER_DAY % self.granularity:
+            raise ValueError('Slot granularity must divide a day evenly')
+
+        self.day_start = datetime.combine(day, time.min)
+        self.size = MINUTES_PER_DAY // self.granularity
+        self.open_mask = 0
+        self.busy_mask = 0
+        self.open_spans = []  # (first_unit, end_unit) of each working interval
+
+    @property
+    def free_mask(self):
+        return self.open_mask & ~self.busy_mask
+
+    def add_open_interval(self, start_minute, end_minute):
+        """Mark [start_minute, end_minute) of the day as working time"""
+        first = self._clamp(-(-start_minute // self.granularity))
+        last = self._clamp(end_minute // self.granularity)
+        if first < last:
+            self.open_mask |= self._span(first, last)
+            self.open_spans.append((first, last))
+
+    def add_booking(self, start, end):
+        """Mark a booked datetime range as busy"""
+        first, last = self._units_between(start, end)
+        if first < last:
+            self.busy_mask |= self._span(first, last)
+
+    def add_bookings(self, booked, capacity=1):
+        """
+        Mark time as busy where at least `capacity` bookings run at once.
+
+        With a capacity of one every booking blocks its own time; with more,
+        a sweep over booking boundaries finds the saturated stretches.
+        """
+        if capacity <= 1:
+            for start, end in booked:
+                self.add_booking(start, end)
+            return
+
+        deltas = {}
+        for start, end in booked:
+            first, last = self._units_between(start, end)
+            if first < last:
+                deltas[first] = deltas.get(first, 0) + 1
+                deltas[last] = deltas.get(last, 0) - 1
+
+        level = 0
+        saturated_from = None
+        for unit in sorted(deltas):
+            level += deltas[unit]
+            if level >= capacity and saturated_from is None:
+                saturated_from = unit
+            elif level < capacity and saturated_from is not None:
+                self.busy_mask |= self._span(saturated_from, unit)
+                saturated_from = None
+
+    def is_open(self, start, end):
+        """Check that a datetime range lies entirely in working time"""
+        return self._covers(self.open_mask, start, end)
+
+    def is_free(self, start, end):
+        """Check that a datetime range is working time and not booked"""
+        return self._covers(self.free_mask, start, end)
+
+    def fit_mask(self, mask, units):
+        """
+        Get a mask with bit i set when units i..i+units-1 are all set in mask.
+
+        Each step ANDs the mask with itself shifted by the run length covered
+        so far, so a run of n units costs O(log n) big-integer operations.
+        """
+        covered = 1
+        while covered < units:
+            step = min(covered, units - covered)
+            mask &= mask >> step
+            covered += step
+        return mask
+
+    def slots(self, duration_minutes, stride_minutes=None):
+        """
+        Get (start, end, available) for every slot on the stride that fits in working time.
+
+        Slots are stepped from the start of each working interval and must end
+        inside it; a slot is available when the free mask has room for it.
+        """
+        stride_minutes = stride_minutes or Config.SLOT_INTERVAL_MINUTES
+        stride_units = max(1, stride_minutes // self.granularity)
+        units = max(1, -(-duration_minutes // self.granularity))
+        free_fits = self.fit_mask(self.free_mask, units)
+        duration = timedelta(minutes=duration_minutes)
+
+        result = []
+        for first, last in self.open_spans:
+            for unit in range(first, last - units + 1, stride_units):
+                slot_start = self.day_start + timedelta(minutes=unit * self.granularity)
+                result.append((slot_start, slot_start + duration, bool((free_fits >> unit) & 1)))
+        return result
+
+    def _clamp(self, unit):
+        return min(max(unit, 0), self.size)
+
+    def _span(self, first, last):
+        return ((1 << (last - first)) - 1) << first
+
+    def _units_between(self, start, end):
+        start_minute = (start - self.day_start) // timedelta(minutes=1)
+        end_minute = -((self.day_start - end) // timedelta(minutes=1))
+        first = self._clamp(start_minute // self.granularity)
+        last = self._clamp(-(-end_minute // self.granularity))
+        return first, last
+
+    def _covers(self, mask, start, end):
+        if start < self.day_start or end > self.day_start + timedelta(days=1):
+            return False
+        first, last = self._units_between(start, end)
+        if first >= last:
+            return False
+        span = self._span(first, last)
+        return mask & span == span
+
+
+def peak_concurrency(booked, start, end):
+    """Get the most bookings running at once within [start, end)"""
+    events = []
+    for booked_start, booked_end in booked:
+        booked_start = max(booked_start, start)
+        booked_end = min(booked_end, end)
+        if booked_start < booked_end:
+            events.append((booked_start, 1))
+            events.append((booked_end, -1))
+
+    # Ends sort before starts at the same instant, so back-to-back bookings don't stack
+    events.sort()
+
+    level = peak = 0
+    for _, delta in events:
+        level += delta
+        peak = max(peak, level)
+    return peak
\ No newline at end of file
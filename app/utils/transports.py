@@ -0,0 +1,382 @@
+import queue
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+import requests
+from requests.adapters import HTTPAdapter
+from sendgrid.helpers.mail import Mail
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+from app.utils.circuit_breaker import CircuitBreaker, call_timeout
+from config import Config
+
+
+def render_substitutions(text, substitutions):
+    """Replace each placeholder token in text with its value"""
+    if text is None:
+        return None
+    for token, value in substitutions.items():
+        text = text.replace(token, str(value))
+    return text
+
+
+class TransportStats:
+    """Thread-safe call, error and latency counters for one transport"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, success, latency, count=1):
+        with self._lock:
+            if success:
+                self.sent += count
+            else:
+                self.errors += count
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def to_dict(self):
+        with self._lock:
+            calls = self.sent + self.errors
+            return {
+                'sent': self.sent,
+                'errors': self.errors,
+                'avg_latency_ms': round(1000 * self.total_latency / calls, 2) if calls else 0.0,
+                'max_latency_ms': round(1000 * self.max_latency, 2)
+            }
+
+
+class Transport:
+    """
+    A long-lived notification backend.
+
+    Subclasses implement _deliver(to, subject, body, timeout) and return
+    True on success; send() wraps it with the circuit breaker, a timeout
+    drawn from the caller's budget, and latency and error accounting.
+    Instances are shared by every thread/greenlet in the worker, so any
+    client they hold must be safe to use concurrently.
+
+    send() raises CircuitOpenError or DeadlineExceeded without contacting
+    the upstream when the call is refused.
+    """
+
+    name = 'transport'
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or Config.NOTIFICATION_TIMEOUT_SECONDS
+        self.stats = TransportStats()
+        self.breaker = CircuitBreaker(self.name)
+
+    def send(self, to, subject, body):
+        timeout = call_timeout(self.timeout)
+        self.breaker.before_call()
+        started = time.perf_counter()
+        success = False
+        try:
+            success = bool(self._deliver(to, subject, body, timeout))
+            return success
+        finally:
+            self.stats.record(success, time.perf_counter() - started)
+            self.breaker.record(success)
+
+    def send_batch(self, subject, body, recipients):
+        """
+        Send one templated message to many recipients.
+
+        recipients: list of (to, substitutions) where substitutions maps
+        placeholder tokens in subject and body to per-recipient values.
+        Returns a success flag per recipient. Backends with a native batch
+        API override this; the default sends one message at a time.
+        """
+        results = []
+        for to, substitutions in recipients:
+            try:
+                results.append(self.send(
+                    to, render_substitutions(subject, substitutions), render_substitutions(body, substitutions)
+                ))
+            except Exception as e:
+                print(f"Batch delivery to {to} failed: {str(e)}")
+                results.append(False)
+        return results
+
+    def _deliver(self, to, subject, body, timeout):
+        raise NotImplementedError
+
+
+class SendGridTransport(Transport):
+    """Email through the SendGrid v3 API over a pooled keep-alive HTTP session"""
+
+    name = 'sendgrid'
+    MAX_PERSONALIZATIONS = 1000  # SendGrid's limit per mail/send request
+
+    def __init__(self, api_key, from_email, api_url=None, pool_size=None, timeout=None):
+        super().__init__(timeout)
+        self.api_key = api_key
+        self.from_email = from_email
+        self.api_url = (api_url or Config.SENDGRID_API_URL).rstrip('/')
+
+        pool_size = pool_size or Config.NOTIFICATION_POOL_SIZE
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+
+    def _deliver(self, to, subject, body, timeout):
+        if not self.api_key:
+            print("SendGrid API key not configured")
+            return False
+
+        message = Mail(
+            from_email=self.from_email,
+            to_emails=to,
+            subject=subject,
+            html_content=body
+        )
+        response = self.session.post(
+            f'{self.api_url}/v3/mail/send', json=message.get(), timeout=timeout
+        )
+        return response.status_code == 202
+
+    def send_batch(self, subject, body, recipients):
+        """Send up to MAX_PERSONALIZATIONS recipients per API call using substitutions"""
+        if not self.api_key:
+            print("SendGrid API key not configured")
+            return [False] * len(recipients)
+
+        results = []
+        for offset in range(0, len(recipients), self.MAX_PERSONALIZATIONS):
+            chunk = recipients[offset:offset + self.MAX_PERSONALIZATIONS]
+            payload = {
+                'personalizations': [
+                    {
+                        'to': [{'email': to}],
+                        'substitutions': {token: str(value) for token, value in substitutions.items()}
+                    }
+                    for to, substitutions in chunk
+                ],
+                'from': {'email': self.from_email},
+                'subject': subject,
+                'content': [{'type': 'text/html', 'value': body}]
+            }
+
+            try:
+                timeout = call_timeout(self.timeout)
+                self.breaker.before_call()
+            except Exception as e:
+                print(f"SendGrid batch send skipped: {str(e)}")
+                results.extend([False] * (len(recipients) - offset))
+                break
+
+            started = time.perf_counter()
+            success = False
+            try:
+                response = self.session.post(
+                    f'{self.api_url}/v3/mail/send', json=payload, timeout=timeout
+                )
+                success = response.status_code == 202
+            except Exception as e:
+                print(f"SendGrid batch send failed: {str(e)}")
+            finally:
+                self.stats.record(success, time.perf_counter() - started, len(chunk))
+                self.breaker.record(success)
+            results.extend([success] * len(chunk))
+        return results
+
+
+class _BudgetedTwilioHttpClient(TwilioHttpClient):
+    """Twilio HTTP client whose requests time out within the caller's budget"""
+
+    def request(self, *args, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = call_timeout(self.timeout)
+        return super().request(*args, timeout=timeout, **kwargs)
+
+
+class TwilioTransport(Transport):
+    """SMS through a single Twilio client backed by a pooled HTTP session"""
+
+    name = 'twilio'
+
+    def __init__(self, account_sid, auth_token, from_number, pool_size=None, timeout=None):
+        super().__init__(timeout)
+        self.from_number = from_number
+        self.client = None
+
+        if account_sid and auth_token:
+            # The Twilio helper takes no per-call timeout, so the client reads
+            # the remaining budget itself on every request
+            http_client = _BudgetedTwilioHttpClient(
+                pool_connections=True,
+                timeout=self.timeout
+            )
+            http_client.session.mount('https://', HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size or Config.NOTIFICATION_POOL_SIZE
+            ))
+            self.client = Client(account_sid, auth_token, http_client=http_client)
+
+    def _deliver(self, to, subject, body, timeout):
+        if not self.client:
+            print("Twilio credentials not configured")
+            return False
+
+        message = self.client.messages.create(
+            body=body,
+            from_=self.from_number,
+            to=to
+        )
+        return message.sid is not None
+
+
+class SmtpTransport(Transport):
+    """Email over SMTP with a bounded pool of reusable connections"""
+
+    name = 'smtp'
+
+    def __init__(self, server, port, use_tls, username, password, from_email, pool_size=None, timeout=None):
+        super().__init__(timeout)
+        self.server = server
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.from_email = from_email
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size or Config.NOTIFICATION_POOL_SIZE)
+
+    def _connect(self, timeout):
+        connection = smtplib.SMTP(self.server, self.port, timeout=timeout)
+        try:
+            if self.use_tls:
+                connection.starttls()
+            if self.username and self.password:
+                connection.login(self.username, self.password)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _deliver(self, to, subject, body, timeout):
+        if not self.server:
+            print("SMTP server not configured")
+            return False
+
+        message = MIMEText(body, 'html')
+        message['Subject'] = subject
+        message['From'] = self.from_email
+        message['To'] = to
+
+        with self._slots:
+            connection, reused = self._checkout(timeout)
+            try:
+                try:
+                    connection.send_message(message)
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    if not reused:
+                        raise
+                    # The server dropped the idle connection; retry once on a fresh one
+                    connection.close()
+                    connection = self._connect(timeout)
+                    connection.send_message(message)
+            except Exception:
+                connection.close()
+                raise
+
+            self._idle.put(connection)
+        return True
+
+    def _checkout(self, timeout):
+        """
+        Get an idle connection whose socket is still open, or a new one.
+
+        Returns (connection, reused). smtplib drops a connection's socket
+        once it notices the server hung up, so those are discarded here.
+        """
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(timeout), False
+            if connection.sock is None:
+                continue
+            try:
+                connection.sock.settimeout(timeout)
+            except OSError:
+                connection.close()
+                continue
+            return connection, True
+
+
+class FakeTransport(Transport):
+    """Records messages in memory instead of sending them"""
+
+    name = 'fake'
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def _deliver(self, to, subject, body, timeout):
+        self.messages.append({'to': to, 'subject': subject, 'body': body})
+        return True
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def _build_transport(channel):
+    backend = Config.EMAIL_TRANSPORT if channel == 'email' else Config.SMS_TRANSPORT
+
+    if backend == 'fake':
+        return FakeTransport()
+    if backend == 'sendgrid':
+        return SendGridTransport(Config.SENDGRID_API_KEY, Config.SENDGRID_FROM_EMAIL)
+    if backend == 'smtp':
+        return SmtpTransport(
+            Config.MAIL_SERVER, Config.MAIL_PORT, Config.MAIL_USE_TLS,
+            Config.MAIL_USERNAME, Config.MAIL_PASSWORD,
+            Config.SENDGRID_FROM_EMAIL or Config.MAIL_USERNAME
+        )
+    if backend == 'twilio':
+        return TwilioTransport(
+            Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN, Config.TWILIO_PHONE_NUMBER
+        )
+    raise ValueError(f'Unknown {channel} transport: {backend}')
+
+
+def get_transport(channel):
+    """Get the worker's shared transport for 'email' or 'sms', creating it on first use"""
+    transport = _transports.get(channel)
+    if transport is None:
+        with _transports_lock:
+            transport = _transports.get(channel)
+            if transport is None:
+                transport = _build_transport(channel)
+                _transports[channel] = transport
+    return transport
+
+
+def set_transport(channel, transport):
+    """Replace the transport for a channel, e.g. with a FakeTransport in tests"""
+    with _transports_lock:
+        _transports[channel] = transport
+
+
+def get_transport_stats():
+    """Get counters and circuit state for every transport created in this worker"""
+    return {
+        channel: {
+            'backend': transport.name,
+            **transport.stats.to_dict(),
+            'breaker': transport.breaker.to_dict()
+        }
+        for channel, transport in list(_transports.items())
+    }
\ No newline at end of file
@@ -0,0 +1,41 @@
+import csv
+import io
+import json
+
+# Fields read from each imported row; anything else is ignored
+IMPORT_FIELDS = ('email', 'password', 'first_name', 'last_name', 'phone', 'role')
+
+
+def parse_user_rows(content, data_format):
+    """
+    Parse a bulk user import into a list of dicts.
+
+    data_format is 'csv' (with a header row naming IMPORT_FIELDS) or 'json'
+    (a list of objects, or {"users": [...]}). Raises ValueError when the
+    content can't be read as that format.
+    """
+    if data_format == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames or 'email' not in reader.fieldnames:
+            raise ValueError('CSV must have a header row including email')
+        rows = list(reader)
+    elif data_format == 'json':
+        try:
+            rows = json.loads(content) if isinstance(content, str) else content
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Invalid JSON: {e}')
+        if isinstance(rows, dict):
+            rows = rows.get('users')
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError('JSON must be a list of user objects or {"users": [...]}')
+    else:
+        raise ValueError('format must be csv or json')
+
+    return [
+        {
+            # Passwords are taken as given, like /auth/register does
+            field: str(row.get(field) or '') if field == 'password' else str(row.get(field) or '').strip()
+            for field in IMPORT_FIELDS
+        }
+        for row in rows
+    ]
\ No newline at end of file
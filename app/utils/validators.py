@@ -4,10 +4,10 @@ from email_validator import validate_email as email_validate, EmailNotValidError
 from config import Config
 
 
-def validate_email(email):
-    """Validate email format"""
+def validate_email(email, check_deliverability=True):
+    """Validate email format, and by default that its domain can receive mail (a DNS lookup)"""
     try:
-        email_validate(email)
+        email_validate(email, check_deliverability=check_deliverability)
         return True
     except EmailNotValidError:
         return False
@@ -50,18 +50,25 @@ def validate_time_slot(start_time, end_time):
         return False, "Cannot book appointments in the past"
     
     # Check business hours
-    start_hour = start_time.hour
-    end_hour = end_time.hour
-    
-    if start_hour < Config.BUSINESS_HOURS_START or end_hour > Config.BUSINESS_HOURS_END:
+    if not is_within_business_hours(start_time, end_time):
         return False, f"Appointments must be between {Config.BUSINESS_HOURS_START}:00 and {Config.BUSINESS_HOURS_END}:00"
     
     # Check if booking is on weekend (optional)
-    if start_time.weekday() >= 5:  # Saturday=5, Sunday=6
+    if not is_business_day(start_time):
         return False, "Bookings not available on weekends"
     
     return True, "Time slot is valid"
 
+def is_within_business_hours(start_time, end_time):
+    """Check that a time range falls inside business hours"""
+    day_open = start_time.replace(hour=Config.BUSINESS_HOURS_START, minute=0, second=0, microsecond=0)
+    day_close = start_time.replace(hour=Config.BUSINESS_HOURS_END, minute=0, second=0, microsecond=0)
+    return start_time >= day_open and end_time <= day_close
+
+def is_business_day(day):
+    """Check that a date or datetime is a weekday"""
+    return day.weekday() < 5  # Saturday=5, Sunday=6
+
 def validate_phone(phone):
     """Validate phone number format"""
     # Basic validation - adjust regex based on your region
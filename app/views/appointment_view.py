@@ -1,17 +1,13 @@
-from flask import request, jsonify
+import json
+from flask import request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.controllers.appointment_controller import AppointmentController
-from app.models.user import User
+from app.utils.auth import current_identity, role_required
 from flask import Blueprint
 
 appointment_bp = Blueprint('appointment', __name__)
 
 
-def get_current_user():
-    """Helper to get current user"""
-    user_id = get_jwt_identity()
-    return User.query.get(user_id)
-
 @appointment_bp.route('/', methods=['POST'])
 @jwt_required()
 def create_appointment():
@@ -24,8 +20,8 @@ def create_appointment():
 @appointment_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_appointments():
-    """Get user appointments"""
-    user = get_current_user()
+    """Get user appointments, one page at a time"""
+    user_id, role, _ = current_identity()
     filters = {
         'status': request.args.get('status'),
         'start_date': request.args.get('start_date'),
@@ -34,16 +30,44 @@ def get_appointments():
     # Remove None values
     filters = {k: v for k, v in filters.items() if v is not None}
     
-    result, status_code = AppointmentController.get_appointments(user.id, user.role, filters)
+    result, status_code = AppointmentController.get_appointments(
+        user_id, role, filters,
+        limit=request.args.get('limit', type=int),
+        cursor=request.args.get('cursor')
+    )
     return jsonify(result), status_code
 
+@appointment_bp.route('/export', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def export_appointments():
+    """Stream appointments as NDJSON or CSV (admin only)"""
+    export_format = request.args.get('format', 'ndjson').lower()
+    filters = {
+        'status': request.args.get('status'),
+        'start_date': request.args.get('start_date'),
+        'end_date': request.args.get('end_date')
+    }
+    filters = {k: v for k, v in filters.items() if v is not None}
+    
+    result, status_code = AppointmentController.export_appointments(export_format, filters)
+    if status_code != 200:
+        return jsonify(result), status_code
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(result),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=appointments.{export_format}'}
+    )
+
 @appointment_bp.route('/<int:appointment_id>', methods=['GET'])
 @jwt_required()
 def get_appointment(appointment_id):
     """Get single appointment by ID"""
-    user = get_current_user()
+    user_id, role, _ = current_identity()
     result, status_code = AppointmentController.get_appointment_by_id(
-        appointment_id, user.id, user.role
+        appointment_id, user_id, role
     )
     return jsonify(result), status_code
 
@@ -51,10 +75,10 @@ def get_appointment(appointment_id):
 @jwt_required()
 def update_appointment(appointment_id):
     """Update appointment"""
-    user = get_current_user()
+    user_id, role, _ = current_identity()
     data = request.get_json()
     result, status_code = AppointmentController.update_appointment(
-        appointment_id, user.id, user.role, data
+        appointment_id, user_id, role, data
     )
     return jsonify(result), status_code
 
@@ -62,11 +86,11 @@ def update_appointment(appointment_id):
 @jwt_required()
 def cancel_appointment(appointment_id):
     """Cancel appointment"""
-    user = get_current_user()
+    user_id, role, _ = current_identity()
     data = request.get_json() or {}
     reason = data.get('reason', '')
     result, status_code = AppointmentController.cancel_appointment(
-        appointment_id, user.id, user.role, reason
+        appointment_id, user_id, role, reason
     )
     return jsonify(result), status_code
 
@@ -83,4 +107,33 @@ def get_available_slots():
     result, status_code = AppointmentController.get_available_slots(
         service_id, date, provider_id
     )
-    return jsonify(result), status_code
\ No newline at end of file
+    return jsonify(result), status_code
+
+@appointment_bp.route('/available-slots/range', methods=['GET'])
+def get_available_slots_range():
+    """Get available time slots for each day in a date range (streamed)"""
+    service_id = request.args.get('service_id', type=int)
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    provider_id = request.args.get('provider_id', type=int)
+    
+    if not service_id or not start_date or not end_date:
+        return jsonify({'error': 'service_id, start_date and end_date are required'}), 400
+    
+    result, status_code = AppointmentController.get_available_slots_range(
+        service_id, start_date, end_date, provider_id
+    )
+    if status_code != 200:
+        return jsonify(result), status_code
+    
+    def generate():
+        yield json.dumps({
+            'service_id': service_id,
+            'start_date': start_date,
+            'end_date': end_date
+        })[:-1] + ', "days": ['
+        for index, day in enumerate(result):
+            yield (', ' if index else '') + json.dumps(day)
+        yield ']}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
\ No newline at end of file
@@ -1,23 +1,33 @@
-from flask import request, jsonify, session, make_response
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import request, jsonify, make_response
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from app.controllers.auth_controller import AuthController
+from app.utils.auth import role_required
+from app.utils.user_import import parse_user_rows
 from flask import Blueprint
 
 auth_bp = Blueprint('auth', __name__)
 
+
+def rate_limited_response(result, status_code):
+    """Build the response, adding Retry-After when the attempt was throttled"""
+    response = jsonify(result)
+    if status_code == 429:
+        response.headers['Retry-After'] = str(result['retry_after'])
+    return response, status_code
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
     data = request.get_json()
-    result, status_code = AuthController.register(data)
-    return jsonify(result), status_code
+    result, status_code = AuthController.register(data, request.remote_addr)
+    return rate_limited_response(result, status_code)
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Login user"""
     data = request.get_json()
-    result, status_code = AuthController.login(data)
-    return jsonify(result), status_code
+    result, status_code = AuthController.login(data, request.remote_addr)
+    return rate_limited_response(result, status_code)
 
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
@@ -36,9 +46,32 @@ def update_profile():
     result, status_code = AuthController.update_profile(user_id, data)
     return jsonify(result), status_code
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Get a new access token with a refresh token"""
+    user_id = get_jwt_identity()
+    result, status_code = AuthController.refresh(user_id)
+    return jsonify(result), status_code
+
 @auth_bp.route('/logout', methods=['POST'])
-@jwt_required()
+@jwt_required(verify_type=False)
 def logout():
-    user_id = get_jwt_identity()
-    session.pop(user_id, None)
-    return jsonify({'message': 'Logout successful'}), 200
\ No newline at end of file
+    """Revoke the current token, and the refresh token if one is sent"""
+    data = request.get_json(silent=True)
+    result, status_code = AuthController.logout(get_jwt(), data)
+    return jsonify(result), status_code
+
+@auth_bp.route('/import', methods=['POST'])
+@jwt_required()
+@role_required('admin')
+def import_users():
+    """Create users in bulk from a CSV (text/csv) or JSON body (admin only)"""
+    data_format = 'csv' if request.mimetype == 'text/csv' else 'json'
+    try:
+        rows = parse_user_rows(request.get_data(as_text=True), data_format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    result, status_code = AuthController.import_users(rows)
+    return jsonify(result), status_code
\ No newline at end of file
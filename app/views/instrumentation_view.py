@@ -0,0 +1,24 @@
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+from app.controllers.instrumentation_controller import InstrumentationController
+from app.utils.auth import role_required
+from flask import Blueprint
+
+instrumentation_bp = Blueprint('instrumentation', __name__)
+
+
+@instrumentation_bp.route('/notifications', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_notification_health():
+    """Get notification transport and circuit breaker state (admin only)"""
+    result, status_code = InstrumentationController.get_notification_health()
+    return jsonify(result), status_code
+
+@instrumentation_bp.route('/passwords', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_password_pool_health():
+    """Get password hashing queue depth and latency (admin only)"""
+    result, status_code = InstrumentationController.get_password_pool_health()
+    return jsonify(result), status_code
\ No newline at end of file
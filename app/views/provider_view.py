@@ -1,7 +1,7 @@
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.controllers.provider_controller import ProviderController
-from app.models.user import User
+from app.utils.auth import role_required
 from flask import Blueprint
 
 
@@ -28,13 +28,10 @@ def get_availability(provider_id):
 
 @provider_bp.route('/availability', methods=['POST'])
 @jwt_required()
+@role_required('provider')
 def set_availability():
     """Set provider availability (provider only)"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user or user.role != 'provider':
-        return jsonify({'error': 'Provider access required'}), 403
     
     data = request.get_json()
     result, status_code = ProviderController.set_availability(user_id, data)
@@ -42,13 +39,10 @@ def set_availability():
 
 @provider_bp.route('/availability/<int:availability_id>', methods=['DELETE'])
 @jwt_required()
+@role_required('provider')
 def delete_availability(availability_id):
     """Delete availability slot (provider only)"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user or user.role != 'provider':
-        return jsonify({'error': 'Provider access required'}), 403
     
     result, status_code = ProviderController.delete_availability(user_id, availability_id)
     return jsonify(result), status_code
\ No newline at end of file
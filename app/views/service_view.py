@@ -1,20 +1,12 @@
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app.controllers.service_controller import ServiceController
-from app.models.user import User
+from app.utils.auth import role_required
 from flask import Blueprint
 
 service_bp = Blueprint('service', __name__)
 
 
-def require_admin():
-    """Decorator to check if user is admin"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or user.role != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    return None
-
 @service_bp.route('/', methods=['GET'])
 def get_services():
     """Get all services"""
@@ -36,35 +28,26 @@ def get_services_by_category(category):
 
 @service_bp.route('/', methods=['POST'])
 @jwt_required()
+@role_required('admin')
 def create_service():
     """Create new service (admin only)"""
-    admin_check = require_admin()
-    if admin_check:
-        return admin_check
-    
     data = request.get_json()
     result, status_code = ServiceController.create_service(data)
     return jsonify(result), status_code
 
 @service_bp.route('/<int:service_id>', methods=['PUT'])
 @jwt_required()
+@role_required('admin')
 def update_service(service_id):
     """Update service (admin only)"""
-    admin_check = require_admin()
-    if admin_check:
-        return admin_check
-    
     data = request.get_json()
     result, status_code = ServiceController.update_service(service_id, data)
     return jsonify(result), status_code
 
 @service_bp.route('/<int:service_id>', methods=['DELETE'])
 @jwt_required()
+@role_required('admin')
 def delete_service(service_id):
     """Delete service (admin only)"""
-    admin_check = require_admin()
-    if admin_check:
-        return admin_check
-    
     result, status_code = ServiceController.delete_service(service_id)
     return jsonify(result), status_code
\ No newline at end of file
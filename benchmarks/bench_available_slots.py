@@ -0,0 +1,91 @@
+"""
+Cost of GET /appointments/available-slots as a day fills up.
+
+Seeds 10, 100 and 1000 bookings on one day, then times the controller
+for a provider's slots against the per-slot conflict query it replaced
+(one _check_conflicts() call per 30 minute candidate).
+
+    python benchmarks/bench_available_slots.py [--calls 20]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from common import count_queries, get_app, next_weekday, seed_database
+
+
+def per_slot_baseline(service, day, provider_id):
+    """The original implementation: one conflict query per candidate slot"""
+    from app.controllers.appointment_controller import AppointmentController
+
+    slots = []
+    current = datetime.combine(day, datetime.min.time()).replace(hour=8)
+    end = current.replace(hour=18)
+    while current < end:
+        slot_end = current + timedelta(minutes=service.duration_minutes)
+        if slot_end.hour <= 18:
+            slots.append({
+                'start_time': current.isoformat(),
+                'end_time': slot_end.isoformat(),
+                'available': not AppointmentController._check_conflicts(provider_id, current, slot_end)
+            })
+        current += timedelta(minutes=30)
+    return slots
+
+
+def add_bookings(ids, day, count):
+    from app import db
+    from app.models import Appointment
+
+    Appointment.query.delete()
+    for _ in range(count):
+        start = datetime.combine(day, datetime.min.time()).replace(hour=8) + timedelta(minutes=random.randrange(0, 600, 5))
+        db.session.add(Appointment(
+            customer_id=ids['customer_id'],
+            provider_id=random.choice(ids['provider_ids']) if random.random() < 0.9 else None,
+            service_id=ids['service_id'],
+            vehicle_id=ids['vehicle_id'],
+            start_time=start,
+            end_time=start + timedelta(minutes=random.choice([15, 30, 60])),
+            status=random.choice(['pending', 'confirmed', 'cancelled', 'completed'])
+        ))
+    db.session.commit()
+
+
+def measure(call, calls):
+    with count_queries() as count:
+        started = time.perf_counter()
+        for _ in range(calls):
+            call()
+        elapsed = time.perf_counter() - started
+    return count.value / calls, 1000 * elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20, help='calls timed per size')
+    args = parser.parse_args()
+
+    from app.controllers.appointment_controller import AppointmentController
+    from app.models import Service
+
+    random.seed(1)
+    ids = seed_database()
+    day = next_weekday()
+    provider_id = ids['provider_ids'][0]
+
+    with get_app().app_context():
+        service = Service.query.get(ids['service_id'])
+        print(f'{"bookings/day":>12}  {"per-slot queries":>26}  {"current":>26}')
+        for bookings in (10, 100, 1000):
+            add_bookings(ids, day, bookings)
+            before = measure(lambda: per_slot_baseline(service, day, provider_id), args.calls)
+            after = measure(
+                lambda: AppointmentController.get_available_slots(service.id, day.isoformat(), provider_id), args.calls
+            )
+            print(f'{bookings:>12}  {before[0]:>6.0f} queries, {before[1]:>7.2f} ms'
+                  f'  {after[0]:>6.0f} queries, {after[1]:>7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
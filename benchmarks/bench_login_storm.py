@@ -0,0 +1,99 @@
+"""
+Latency of cheap requests while logins hammer bcrypt.
+
+Starts gunicorn with the given server profile, then probes GET /services/
+while STORM threads log in back to back. Before hashing moved off the
+hub, one eventlet worker stalled for every hash and the probe's p99
+reached seconds; it should now stay close to the idle figure.
+
+    python benchmarks/bench_login_storm.py [--profile realtime] [--storm 8] [--seconds 8]
+"""
+import argparse
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+import requests
+from common import PASSWORD, ROOT, bench_env, percentiles, seed_database
+
+
+def probe(url, seconds):
+    samples = []
+    session = requests.Session()
+    end = time.time() + seconds
+    while time.time() < end:
+        started = time.perf_counter()
+        try:
+            session.get(url + '/services/', timeout=15)
+        except requests.RequestException:
+            samples.append(15.0)
+            continue
+        samples.append(time.perf_counter() - started)
+        time.sleep(0.02)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', default='realtime')
+    parser.add_argument('--storm', type=int, default=8, help='concurrent login loops')
+    parser.add_argument('--seconds', type=float, default=8)
+    parser.add_argument('--port', default='5077')
+    args = parser.parse_args()
+
+    seed_database()
+    url = f'http://127.0.0.1:{args.port}'
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', 'run:app'],
+        cwd=ROOT,
+        # The login throttle would turn the storm into cheap 429s
+        env=bench_env(SERVER_PROFILE=args.profile, PORT=args.port,
+                      AUTH_IP_RATE_PER_MINUTE='1000000', AUTH_IP_BURST='1000000',
+                      AUTH_EMAIL_RATE_PER_MINUTE='1000000', AUTH_EMAIL_BURST='1000000'),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(100):
+            try:
+                requests.get(url + '/services/', timeout=1)
+                break
+            except requests.RequestException:
+                time.sleep(0.2)
+
+        print('idle ', probe(url, 3))
+
+        stop = threading.Event()
+        logins = []
+
+        def storm():
+            session = requests.Session()
+            while not stop.is_set():
+                try:
+                    response = session.post(url + '/auth/login',
+                                            json={'email': 'customer@example.com', 'password': PASSWORD}, timeout=30)
+                except requests.RequestException:
+                    continue
+                logins.append(response.status_code)
+
+        threads = [threading.Thread(target=storm) for _ in range(args.storm)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        print('storm', probe(url, args.seconds))
+        stop.set()
+        for thread in threads:
+            thread.join()
+        print('logins', dict(Counter(logins)))
+
+        token = requests.post(url + '/auth/login', json={'email': 'admin@example.com', 'password': PASSWORD}).json()
+        print(requests.get(url + '/instrumentation/passwords',
+                           headers={'Authorization': f'Bearer {token["access_token"]}'}).json())
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+SendGrid messages per second: a client per message vs the pooled transport.
+
+Runs a local HTTPS stub of the v3 mail/send endpoint (with a throwaway
+self-signed certificate made by the openssl CLI), then sends the same
+messages through a new SendGridAPIClient each time, as send_email used
+to, and through SendGridTransport's keep-alive session. Prints the TLS
+connections each side opened and its throughput.
+
+    python benchmarks/bench_notification_transport.py [--messages 500]
+"""
+import argparse
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import common  # noqa: F401  (sets up the environment and import path)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(202)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Counts the connections it accepts"""
+    connections = 0
+
+    def get_request(self):
+        StubServer.connections += 1
+        return super().get_request()
+
+
+def start_stub(directory):
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=127.0.0.1',
+         '-addext', 'subjectAltName=IP:127.0.0.1', '-keyout', key, '-out', cert],
+        check=True, capture_output=True
+    )
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'https://127.0.0.1:{server.server_port}', cert
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url, cert = start_stub(directory)
+        # Both clients verify the stub's certificate through requests/urllib
+        os.environ['REQUESTS_CA_BUNDLE'] = cert
+        ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=cert)
+
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail
+        from app.utils.transports import SendGridTransport
+
+        StubServer.connections = 0
+        started = time.perf_counter()
+        for _ in range(args.messages):
+            client = SendGridAPIClient('bench-key', host=url)
+            response = client.send(Mail(from_email='shop@example.com', to_emails='customer@example.com',
+                                        subject='Reminder', html_content='<p>See you soon</p>'))
+            assert response.status_code == 202
+        before = (StubServer.connections, args.messages / (time.perf_counter() - started))
+
+        transport = SendGridTransport('bench-key', 'shop@example.com', api_url=url)
+        StubServer.connections = 0
+        started = time.perf_counter()
+        for _ in range(args.messages):
+            assert transport.send('customer@example.com', 'Reminder', '<p>See you soon</p>')
+        after = (StubServer.connections, args.messages / (time.perf_counter() - started))
+
+    print(f'client per message: {before[0]:>4} TLS connections, {before[1]:>6.0f} msg/s')
+    print(f'pooled transport:   {after[0]:>4} TLS connections, {after[1]:>6.0f} msg/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Frames sent per booking to clients watching available slots.
+
+Connects CLIENTS Socket.IO test clients, 80% subscribed to one of 5
+services x 10 days and 20% to one of 3 providers x 5 services x 10 days,
+then books one appointment. Compares the original global slots_updated
+broadcast, which every client answered with a refetch, with the
+targeted slots_delta pushes.
+
+    python benchmarks/bench_slot_fanout.py [--clients 3000]
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+from common import get_app, next_weekday, seed_database
+from config import Config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=3000)
+    args = parser.parse_args()
+
+    from app import db, socketio
+    from app.controllers.appointment_controller import AppointmentController
+    from app.models import Service
+
+    random.seed(1)
+    ids = seed_database()
+    app = get_app()
+    with app.app_context():
+        extra = [Service(name=f'Service {i}', duration_minutes=30, price=10, category='maintenance') for i in range(4)]
+        db.session.add_all(extra)
+        db.session.commit()
+        service_ids = [ids['service_id']] + [service.id for service in extra]
+
+    first_day = next_weekday()
+    days = [(first_day + timedelta(days=i)).isoformat() for i in range(10)]
+
+    started = time.perf_counter()
+    clients = []
+    for _ in range(args.clients):
+        client = socketio.test_client(app)
+        if random.random() < 0.8:
+            client.emit('subscribe_slots', {'service_id': random.choice(service_ids), 'date': random.choice(days)})
+        else:
+            client.emit('subscribe_slots', {'service_id': random.choice(service_ids),
+                                            'provider_id': random.choice(ids['provider_ids']), 'date': random.choice(days)})
+        clients.append(client)
+    print(f'{args.clients} clients connected and subscribed in {time.perf_counter() - started:.1f}s')
+
+    def received(event):
+        return sum(sum(1 for message in client.get_received() if message['name'] == event) for client in clients)
+
+    received(None)
+    socketio.emit('slots_updated', {'service_id': ids['service_id'], 'date': days[0]})
+    broadcast = received('slots_updated')
+
+    with app.app_context():
+        _, status_code = AppointmentController.create_appointment(ids['customer_id'], {
+            'service_id': ids['service_id'],
+            'vehicle_id': ids['vehicle_id'],
+            'provider_id': ids['provider_ids'][0],
+            'start_time': f'{first_day}T10:00:00'
+        })
+        assert status_code == 201
+    # Let the debounced push go out
+    time.sleep(Config.SLOT_PUSH_DEBOUNCE_SECONDS + 1)
+    targeted = received('slots_delta')
+
+    print(f'global broadcast: {broadcast:>5} frames, each followed by GET /available-slots')
+    print(f'targeted deltas:  {targeted:>5} frames, applied without a refetch')
+
+
+if __name__ == '__main__':
+    main()
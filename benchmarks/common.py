@@ -0,0 +1,116 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+# Benchmarks run against a throwaway SQLite database unless DATABASE_URI
+# points somewhere else. Configuration is read when config.py is
+# imported, so this module must be imported before anything from the app.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), 'carcare-bench.db')
+os.environ.setdefault('DATABASE_URI', f'sqlite:///{DB_PATH}')
+os.environ.setdefault('SECRET_KEY', 'bench-secret-key')
+os.environ.setdefault('JWT_SECRET_KEY', 'bench-jwt-secret-key-with-enough-length')
+os.environ.setdefault('NOTIFICATION_TRANSPORT', 'fake')
+
+PASSWORD = 'Passw0rd!'
+
+_app = None
+
+
+def get_app():
+    """The benchmark's application, created on first use"""
+    global _app
+    if _app is None:
+        from app import create_app
+        _app = create_app()
+    return _app
+
+
+def bench_env(**overrides):
+    """Environment for a server started by a benchmark, sharing this database"""
+    env = dict(os.environ)
+    env.update(overrides)
+    return env
+
+
+def seed_database(providers=3):
+    """
+    Recreate the tables with an admin, a customer with a vehicle, providers
+    and a 45 minute service. Returns the ids in a dict.
+    """
+    from app import db
+    from app.models import Service, User, Vehicle
+
+    with get_app().app_context():
+        db.drop_all()
+        db.create_all()
+
+        admin = User(email='admin@example.com', first_name='Ada', last_name='Admin', role='admin')
+        customer = User(email='customer@example.com', first_name='Cy', last_name='Customer',
+                        role='customer', phone='+15555550100')
+        staff = [
+            User(email=f'provider{i}@example.com', first_name='Pat', last_name=f'Provider{i}', role='provider')
+            for i in range(providers)
+        ]
+        for user in [admin, customer] + staff:
+            user.set_password(PASSWORD)
+        service = Service(name='Oil change', duration_minutes=45, price=50, category='maintenance')
+        db.session.add_all([admin, customer, service] + staff)
+        db.session.commit()
+
+        vehicle = Vehicle(user_id=customer.id, make='Toyota', model='Corolla', year=2020)
+        db.session.add(vehicle)
+        db.session.commit()
+
+        return {
+            'admin_id': admin.id,
+            'customer_id': customer.id,
+            'provider_ids': [user.id for user in staff],
+            'service_id': service.id,
+            'vehicle_id': vehicle.id
+        }
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements run inside a `with count_queries() as count:` block"""
+    from sqlalchemy import event
+    from app import db
+
+    count = SimpleNamespace(value=0)
+
+    def before_cursor_execute(*args, **kwargs):
+        count.value += 1
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield count
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def next_weekday(days=7):
+    """A weekday at least `days` out"""
+    day = date.today() + timedelta(days=days)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def percentiles(samples):
+    """p50/p99/max of a list of seconds, in milliseconds"""
+    if not samples:
+        return {'n': 0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        'n': len(ordered),
+        'p50': round(1000 * pick(0.5), 1),
+        'p99': round(1000 * pick(0.99), 1),
+        'max': round(1000 * ordered[-1], 1)
+    }
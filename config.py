@@ -4,6 +4,10 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from server_profile import resolve_server_profile
+
+SERVER_SETTINGS = resolve_server_profile()
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.getenv('SECRET_KEY')
@@ -13,12 +17,35 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    REVOCATION_SYNC_SECONDS = float(os.getenv('REVOCATION_SYNC_SECONDS', 5))  # Delay before a logout applies in other workers
+    REVOCATION_SYNC_OVERLAP_SECONDS = 60  # How far back each sync re-reads, covering slow commits
+    USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', 60))  # Cap on how stale a cached user row gets
+    USER_CACHE_MAX_ENTRIES = 4096  # Users each worker keeps cached
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))  # Cost of new password hashes; each step doubles it
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', SERVER_SETTINGS['cpus']))  # Concurrent hashes per worker
+    
+    # Login/register admission control, per worker
+    AUTH_IP_RATE_PER_MINUTE = float(os.getenv('AUTH_IP_RATE_PER_MINUTE', 30))
+    AUTH_IP_BURST = int(os.getenv('AUTH_IP_BURST', 10))
+    AUTH_EMAIL_RATE_PER_MINUTE = float(os.getenv('AUTH_EMAIL_RATE_PER_MINUTE', 5))
+    AUTH_EMAIL_BURST = int(os.getenv('AUTH_EMAIL_BURST', 5))
+    AUTH_RATE_LIMIT_MAX_KEYS = int(os.getenv('AUTH_RATE_LIMIT_MAX_KEYS', 100000))  # Buckets kept per limiter, least recently used evicted
+    # Proxies in front of the app that append to X-Forwarded-For; the client
+    # address is read that many hops back. Leave at 0 when clients connect
+    # directly, or they could pick their own address.
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
     
     # CORS Configuration
     CORS_HEADERS = 'Content-Type'
     
     # SocketIO Configuration
     SOCKETIO_CORS_ALLOWED_ORIGINS = "*"
+    SOCKETIO_ASYNC_MODE = SERVER_SETTINGS['async_mode']  # eventlet, gevent or threading; see server_profile.py
+    # Broker that fans emits out to every worker, e.g. redis://redis:6379/0;
+    # memory:// is an in-process stand-in for tests. Unset means single-worker.
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    SLOT_PUSH_DEBOUNCE_SECONDS = float(os.getenv('SLOT_PUSH_DEBOUNCE_SECONDS', 0.2))  # Slot changes within this window share one push per room
+    SLOT_PUSH_MAX_SNAPSHOTS = 4096  # Rooms whose last pushed slots each worker remembers
     
     # Notification APIs
     TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
@@ -30,13 +57,60 @@ class Config:
     MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
     MAIL_USE_TLS = bool(int(os.getenv("MAIL_USE_TLS", 1)))
     MAIL_USERNAME = os.getenv("MAIL_USERNAME")
+    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
     SENDGRID_FROM_EMAIL = os.getenv('SENDGRID_FROM_EMAIL')
+    SENDGRID_API_URL = os.getenv('SENDGRID_API_URL', 'https://api.sendgrid.com')
+    
+    # Notification transports: 'fake' records messages in memory
+    NOTIFICATION_TRANSPORT = os.getenv('NOTIFICATION_TRANSPORT', 'live')
+    EMAIL_TRANSPORT = os.getenv('EMAIL_TRANSPORT', 'fake' if NOTIFICATION_TRANSPORT == 'fake' else 'sendgrid')  # sendgrid, smtp, fake
+    SMS_TRANSPORT = os.getenv('SMS_TRANSPORT', 'fake' if NOTIFICATION_TRANSPORT == 'fake' else 'twilio')  # twilio, fake
+    NOTIFICATION_POOL_SIZE = int(os.getenv('NOTIFICATION_POOL_SIZE', 10))  # Keep-alive connections per transport
+    NOTIFICATION_TIMEOUT_SECONDS = float(os.getenv('NOTIFICATION_TIMEOUT_SECONDS', 10))
+    NOTIFICATION_REQUEST_BUDGET_SECONDS = float(os.getenv('NOTIFICATION_REQUEST_BUDGET_SECONDS', 3))  # Total notification time per HTTP request
+    
+    # Circuit breakers around the notification transports
+    BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', 0.5))  # Failure share that opens the circuit
+    BREAKER_WINDOW_SIZE = int(os.getenv('BREAKER_WINDOW_SIZE', 20))  # Recent calls the failure rate is measured over
+    BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', 5))
+    BREAKER_RESET_SECONDS = float(os.getenv('BREAKER_RESET_SECONDS', 30))  # Open time before a probe call
+    
+    # Notification outbox dispatcher
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 100))
+    OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv('OUTBOX_POLL_INTERVAL_SECONDS', 2))
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_RETRY_BASE_SECONDS = 30  # Doubled after each failed attempt
+    OUTBOX_BATCH_BUDGET_SECONDS = float(os.getenv('OUTBOX_BATCH_BUDGET_SECONDS', 60))  # Time one dispatch batch may spend sending
+    NOTIFICATION_COALESCE_WINDOW_SECONDS = int(os.getenv('NOTIFICATION_COALESCE_WINDOW_SECONDS', 30))  # Status messages wait this long for a newer state
+    NOTIFICATION_DEDUP_WINDOW_SECONDS = int(os.getenv('NOTIFICATION_DEDUP_WINDOW_SECONDS', 600))  # Identical messages within this window are dropped
+    
+    # Appointment reminders
+    REMINDER_HOURS_AHEAD = int(os.getenv('REMINDER_HOURS_AHEAD', 24))
+    REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 500))
+    REMINDER_POLL_INTERVAL_SECONDS = float(os.getenv('REMINDER_POLL_INTERVAL_SECONDS', 300))
+    SMS_RATE_PER_SECOND = float(os.getenv('SMS_RATE_PER_SECOND', 1))  # Twilio long codes send 1 message/second
+    SMS_BURST = int(os.getenv('SMS_BURST', 1))
     
     # Business Logic
     BOOKING_BUFFER_MINUTES = 15  # Buffer between appointments
     CANCELLATION_WINDOW_HOURS = 24  # Hours before appointment to allow cancellation
     BUSINESS_HOURS_START = 8  # 8 AM
     BUSINESS_HOURS_END = 18  # 6 PM
+    SHOP_BAY_COUNT = int(os.getenv('SHOP_BAY_COUNT', 0)) or None  # Concurrent unassigned bookings; defaults to active providers
+    AVAILABILITY_TEMPLATE_TTL_SECONDS = int(os.getenv('AVAILABILITY_TEMPLATE_TTL_SECONDS', 300))  # Backstop; changes reach other workers through schedule_versions
+    SLOT_GRANULARITY_MINUTES = int(os.getenv('SLOT_GRANULARITY_MINUTES', 5))  # Occupancy bitmap resolution: 5, 10 or 15
+    SLOT_INTERVAL_MINUTES = 30  # Step between offered slot start times
+    CONFLICT_INDEX_MAX_DAYS = 1024  # Provider-days kept in each worker's conflict index
+    MAX_SLOT_RANGE_DAYS = 31  # Longest range served by /appointments/available-slots/range
+    APPOINTMENTS_PAGE_SIZE = 50  # Default page size for GET /appointments
+    APPOINTMENTS_MAX_PAGE_SIZE = 200  # Largest limit a GET /appointments caller may ask for
+    EXPORT_BATCH_SIZE = 1000  # Rows fetched per server-side cursor round trip
+    USER_IMPORT_MAX_ROWS = int(os.getenv('USER_IMPORT_MAX_ROWS', 10000))  # Rows per /auth/import request or CLI import
 
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI')
+    # Pool sized per worker from the server profile; SQLite keeps its own pooling
+    SQLALCHEMY_ENGINE_OPTIONS = {} if (SQLALCHEMY_DATABASE_URI or '').startswith('sqlite') else {
+        'pool_size': SERVER_SETTINGS['db_pool_size'],
+        'max_overflow': SERVER_SETTINGS['db_max_overflow']
+    }
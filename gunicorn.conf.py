@@ -0,0 +1,20 @@
+# Gunicorn settings derived from the server profile (see server_profile.py):
+#
+#     SERVER_PROFILE=realtime gunicorn --config gunicorn.conf.py run:app
+import os
+from server_profile import resolve_server_profile, describe_server_profile
+
+_settings = resolve_server_profile()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = _settings['worker_class']
+workers = _settings['workers']
+threads = _settings['threads']
+worker_connections = _settings['worker_connections']
+timeout = int(os.getenv('WEB_TIMEOUT', 120))
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    server.log.info('Server profile: %s', describe_server_profile(_settings))
\ No newline at end of file
@@ -1,18 +1,25 @@
 import os
-from app import create_app
-from flask_socketio import SocketIO
+from server_profile import resolve_server_profile, describe_server_profile, patch_for_async_mode
 
+settings = resolve_server_profile()
 
+if __name__ == '__main__':
+    # Must run before the app imports anything that eventlet/gevent patch;
+    # under gunicorn the worker class patches instead
+    patch_for_async_mode(settings['async_mode'])
 
-app = create_app()
+from app import create_app, socketio
 
-socketio = SocketIO(app)
+app = create_app()
 
 if __name__ == '__main__':
+    print(f'Server profile: {describe_server_profile(settings)}')
     # Run the app with WebSocket support
     socketio.run(
         app,
         host='0.0.0.0',
-        port=5000,
-        debug=True
+        port=int(os.getenv('PORT', 5000)),
+        debug=settings['debug'],
+        # The Werkzeug server is only used by the development profile
+        allow_unsafe_werkzeug=settings['debug']
     )
\ No newline at end of file
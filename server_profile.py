@@ -0,0 +1,119 @@
+import importlib.util
+import os
+
+# Concurrency profiles, picked with SERVER_PROFILE and fine-tuned with the
+# WEB_* / DB_* environment variables. This module imports nothing from the
+# app, so gunicorn.conf.py can read it in the master process before the
+# workers monkey patch.
+#
+# Socket.IO long-polling needs sticky sessions, which gunicorn's own load
+# balancing lacks, so 'realtime' runs one worker per container; scale it
+# out with more containers behind a sticky load balancer. 'api' runs a
+# worker per core and suits clients that connect with websocket only.
+PROFILES = {
+    'development': {'async_mode': 'threading', 'workers': 1, 'threads': 1, 'debug': True},
+    'realtime': {'async_mode': 'eventlet', 'workers': 1, 'worker_connections': 1000},
+    'api': {'async_mode': 'threading', 'workers': 'per_core', 'threads': 4},
+}
+
+WORKER_CLASSES = {
+    'eventlet': 'eventlet',
+    'gevent': 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker',
+    'threading': 'gthread',
+}
+
+# Packages each async mode needs beyond the base requirements
+ASYNC_MODE_PACKAGES = {
+    'eventlet': ('eventlet',),
+    'gevent': ('gevent', 'geventwebsocket'),
+    'threading': (),
+}
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def resolve_server_profile():
+    """
+    Work out the effective server settings.
+
+    Returns a dict with the profile name, async mode, gunicorn worker
+    class, workers, threads and worker connections, and the database pool
+    size and overflow for each worker.
+    """
+    name = os.getenv('SERVER_PROFILE', 'development')
+    if name not in PROFILES:
+        raise ValueError(f'Unknown SERVER_PROFILE: {name}')
+    profile = PROFILES[name]
+
+    async_mode = os.getenv('SOCKETIO_ASYNC_MODE', profile['async_mode'])
+    if async_mode not in WORKER_CLASSES:
+        raise ValueError(f'Unknown SOCKETIO_ASYNC_MODE: {async_mode}')
+    missing = [
+        package for package in ASYNC_MODE_PACKAGES[async_mode]
+        if importlib.util.find_spec(package) is None
+    ]
+    if missing:
+        raise RuntimeError(f'SOCKETIO_ASYNC_MODE={async_mode} needs: {", ".join(missing)}')
+
+    cpus = os.cpu_count() or 1
+    workers = _env_int('WEB_WORKERS', profile['workers'])
+    if workers == 'per_core':
+        workers = 2 * cpus + 1
+
+    if async_mode == 'threading':
+        # Under eventlet/gevent a request is a greenlet, so threads do nothing
+        threads = _env_int('WEB_THREADS', profile.get('threads', 1))
+        worker_connections = threads
+        # Each thread holds at most one connection; leave a little room for
+        # background tasks such as the slot pusher
+        pool_size = _env_int('DB_POOL_SIZE', max(threads, 5))
+        max_overflow = _env_int('DB_MAX_OVERFLOW', 2)
+    else:
+        threads = 1
+        worker_connections = _env_int('WEB_WORKER_CONNECTIONS', profile.get('worker_connections', 1000))
+        # Greenlets queue for connections, so the pool tracks database
+        # capacity rather than the number of open sockets
+        pool_size = _env_int('DB_POOL_SIZE', 10)
+        max_overflow = _env_int('DB_MAX_OVERFLOW', 10)
+
+    return {
+        'profile': name,
+        'async_mode': async_mode,
+        'worker_class': WORKER_CLASSES[async_mode],
+        'workers': workers,
+        'threads': threads,
+        'worker_connections': worker_connections,
+        'db_pool_size': pool_size,
+        'db_max_overflow': max_overflow,
+        'debug': profile.get('debug', False),
+        'cpus': cpus,
+    }
+
+
+def describe_server_profile(settings):
+    """One-line summary of the effective concurrency model for startup logs"""
+    per_worker = (
+        f"{settings['threads']} threads" if settings['async_mode'] == 'threading'
+        else f"{settings['worker_connections']} connections"
+    )
+    max_db = settings['workers'] * (settings['db_pool_size'] + settings['db_max_overflow'])
+    return (
+        f"profile={settings['profile']} async_mode={settings['async_mode']} "
+        f"worker_class={settings['worker_class']} workers={settings['workers']} "
+        f"({per_worker} each, {settings['cpus']} CPUs) "
+        f"db_pool={settings['db_pool_size']}+{settings['db_max_overflow']} per worker "
+        f"(up to {max_db} database connections)"
+    )
+
+
+def patch_for_async_mode(async_mode):
+    """Monkey patch the standard library for eventlet/gevent; call before any other import"""
+    if async_mode == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    elif async_mode == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
\ No newline at end of file
@@ -0,0 +1,130 @@
+import os
+import tempfile
+
+# Configuration is read when config.py is imported, so set it up first
+_db_dir = tempfile.mkdtemp(prefix='carcare-tests-')
+os.environ.setdefault('DATABASE_URI', f'sqlite:///{os.path.join(_db_dir, "test.db")}')
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-with-enough-length')
+os.environ.setdefault('SERVER_PROFILE', 'development')
+os.environ.setdefault('NOTIFICATION_TRANSPORT', 'fake')
+os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+import pytest
+from app import create_app, db
+from app.models import Appointment, Service, User, Vehicle
+
+PASSWORD = 'Passw0rd!'
+
+_app = create_app()
+
+
+@pytest.fixture
+def app():
+    """The application with empty tables and cold per-worker caches"""
+    from app.sockets import slot_push
+    from app.utils import auth, availability_templates, conflict_index, revocation
+
+    with _app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        conflict_index._indexes.clear()
+        availability_templates._templates.clear()
+        auth._users.clear()
+        auth._ip_limiter = auth._email_limiter = None
+        revocation._revoked.clear()
+        revocation._next_sync = 0.0
+        revocation._synced_through = None
+        slot_push._snapshots.clear()
+
+        yield _app
+        db.session.remove()
+
+
+@pytest.fixture
+def seed(app):
+    """An admin, a customer with a vehicle, three providers and a 45 minute service"""
+    admin = User(email='admin@example.com', first_name='Ada', last_name='Admin', role='admin')
+    customer = User(email='customer@example.com', first_name='Cy', last_name='Customer',
+                    role='customer', phone='+15555550100')
+    providers = [
+        User(email=f'provider{i}@example.com', first_name='Pat', last_name=f'Provider{i}', role='provider')
+        for i in range(3)
+    ]
+    for user in [admin, customer] + providers:
+        user.set_password(PASSWORD)
+    service = Service(name='Oil change', duration_minutes=45, price=50, category='maintenance')
+    db.session.add_all([admin, customer, service] + providers)
+    db.session.commit()
+
+    vehicle = Vehicle(user_id=customer.id, make='Toyota', model='Corolla', year=2020)
+    db.session.add(vehicle)
+    db.session.commit()
+
+    return SimpleNamespace(
+        admin_id=admin.id,
+        customer_id=customer.id,
+        provider_ids=[provider.id for provider in providers],
+        service_id=service.id,
+        vehicle_id=vehicle.id
+    )
+
+
+@pytest.fixture
+def login(client):
+    """Log a user in by email and get request headers carrying the access token"""
+    def _login(email):
+        response = client.post('/auth/login', json={'email': email, 'password': PASSWORD})
+        assert response.status_code == 200, response.get_json()
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return _login
+
+
+@pytest.fixture
+def query_counter(app):
+    """Count the SQL statements run inside a `with query_counter() as count:` block"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _count():
+        count = SimpleNamespace(value=0)
+
+        def before_cursor_execute(*args, **kwargs):
+            count.value += 1
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield count
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return _count
+
+
+@pytest.fixture
+def booking_day():
+    """A weekday a week out, clear of the cancellation window"""
+    day = date.today() + timedelta(days=7)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+@pytest.fixture
+def appointment_id(seed, booking_day):
+    """A confirmed appointment of the customer with the first provider on booking_day"""
+    appointment = Appointment(
+        customer_id=seed.customer_id,
+        provider_id=seed.provider_ids[0],
+        service_id=seed.service_id,
+        vehicle_id=seed.vehicle_id,
+        start_time=datetime.combine(booking_day, time(10)),
+        end_time=datetime.combine(booking_day, time(10, 45)),
+        status='confirmed'
+    )
+    db.session.add(appointment)
+    db.session.commit()
+    return appointment.id
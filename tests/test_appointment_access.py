@@ -0,0 +1,34 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User
+
+
+@pytest.fixture
+def orphaned_token(seed):
+    """A token without role claims, as issued before they existed, for a user since deleted"""
+    user = User(email='gone@example.com', first_name='Gone', last_name='User', role='customer')
+    user.set_password('Passw0rd!')
+    db.session.add(user)
+    db.session.commit()
+    token = create_access_token(identity=user.id)
+    db.session.delete(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_unresolved_role_sees_no_appointments(client, orphaned_token, appointment_id):
+    assert client.get('/appointments/', headers=orphaned_token).status_code == 403
+    assert client.get(f'/appointments/{appointment_id}', headers=orphaned_token).status_code == 403
+    assert client.post(f'/appointments/{appointment_id}/cancel', json={}, headers=orphaned_token).status_code == 403
+    assert client.put(f'/appointments/{appointment_id}', json={'notes': 'x'}, headers=orphaned_token).status_code == 403
+
+
+def test_each_role_sees_its_own_appointments(client, seed, login, appointment_id):
+    for email, visible in (('customer@example.com', True), ('provider0@example.com', True),
+                           ('provider1@example.com', False), ('admin@example.com', True)):
+        headers = login(email)
+        listed = client.get('/appointments/', headers=headers).get_json()['appointments']
+        assert [apt['id'] for apt in listed] == ([appointment_id] if visible else [])
+        expected = 200 if visible else 403
+        assert client.get(f'/appointments/{appointment_id}', headers=headers).status_code == expected
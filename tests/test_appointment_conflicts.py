@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app import db
+
+OVERLAP = 'conflicting key value violates exclusion constraint "excl_appointments_provider_overlap"'
+FOREIGN_KEY = 'insert or update on table "appointments" violates foreign key constraint "appointments_service_id_fkey"'
+
+
+@pytest.mark.parametrize('message, status_code', [(OVERLAP, 409), (FOREIGN_KEY, 500)])
+def test_integrity_errors_map_to_conflict_only_for_overlaps(client, seed, login, monkeypatch, appointment_id,
+                                                            booking_day, message, status_code):
+    admin = login('admin@example.com')
+    customer = login('customer@example.com')
+
+    def commit():
+        raise IntegrityError('INSERT INTO appointments ...', {}, Exception(message))
+
+    monkeypatch.setattr(db.session, 'commit', commit)
+    rescheduled = client.put(f'/appointments/{appointment_id}', headers=admin,
+                             json={'start_time': f'{booking_day}T11:00:00'})
+    created = client.post('/appointments/', headers=customer, json={
+        'service_id': seed.service_id,
+        'vehicle_id': seed.vehicle_id,
+        'provider_id': seed.provider_ids[1],
+        'start_time': f'{booking_day}T14:00:00'
+    })
+    assert (rescheduled.status_code, created.status_code) == (status_code, status_code)
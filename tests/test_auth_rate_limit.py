@@ -0,0 +1,96 @@
+from app import db
+from app.controllers import auth_controller
+from app.models import User
+from app.utils.auth import get_cached_user
+from app.utils.validators import validate_email
+from config import Config
+
+
+def attempt(client, email, ip='203.0.113.7'):
+    response = client.post('/auth/login', json={'email': email, 'password': 'Wrong-passw0rd'},
+                           environ_base={'REMOTE_ADDR': ip})
+    return response.status_code
+
+
+def test_attempt_rejected_for_its_email_costs_the_ip_nothing(app, client, monkeypatch):
+    # Buckets that don't refill within the test
+    monkeypatch.setattr(Config, 'AUTH_IP_RATE_PER_MINUTE', 0.001)
+    monkeypatch.setattr(Config, 'AUTH_IP_BURST', 6)
+    monkeypatch.setattr(Config, 'AUTH_EMAIL_RATE_PER_MINUTE', 0.001)
+    monkeypatch.setattr(Config, 'AUTH_EMAIL_BURST', 2)
+
+    assert [attempt(client, 'victim@example.com') for _ in range(5)] == [401, 401, 429, 429, 429]
+    # Only the two admitted attempts came out of the IP's bucket
+    assert [attempt(client, f'user{i}@example.com') for i in range(5)] == [401, 401, 401, 401, 429]
+    # Other addresses are unaffected
+    assert attempt(client, 'user9@example.com', ip='198.51.100.1') == 401
+
+
+def test_throttled_response_says_when_to_retry(app, client, monkeypatch):
+    monkeypatch.setattr(Config, 'AUTH_EMAIL_BURST', 1)
+
+    attempt(client, 'victim@example.com')
+    response = client.post('/auth/login', json={'email': 'victim@example.com', 'password': 'Wrong-passw0rd'})
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) == response.get_json()['retry_after'] > 0
+
+
+def test_profile_shows_a_change_saved_by_another_worker(client, seed, login):
+    headers = login('customer@example.com')
+    user = User.query.filter_by(email='customer@example.com').first()
+    # This worker has the user cached; the change below never clears it
+    assert get_cached_user(user.id)['first_name'] == 'Cy'
+    user.first_name = 'Cyril'
+    db.session.commit()
+
+    response = client.get('/auth/profile', headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['user']['first_name'] == 'Cyril'
+
+
+def test_import_takes_csv_and_json_and_reports_failed_rows(client, seed, login, monkeypatch):
+    # No DNS here; check the format only
+    monkeypatch.setattr(auth_controller, 'validate_email',
+                        lambda email, check_deliverability=True: validate_email(email, check_deliverability=False))
+    headers = login('admin@example.com')
+
+    csv_body = (
+        'email,password,first_name,last_name,role\n'
+        'new1@example.com,Passw0rd!,New,One,provider\n'
+        'customer@example.com,Passw0rd!,Cy,Customer,\n'
+        'new2@example.com,short,New,Two,\n'
+    )
+    response = client.post('/auth/import', data=csv_body, content_type='text/csv', headers=headers)
+    assert response.status_code == 200
+    result = response.get_json()
+    assert (result['imported'], result['failed']) == (1, 2)
+    assert [(error['row'], error['email']) for error in result['errors']] == [
+        (1, 'customer@example.com'), (2, 'new2@example.com')
+    ]
+    assert result['errors'][0]['error'] == 'Email already registered'
+    assert User.query.filter_by(email='new1@example.com').one().role == 'provider'
+
+    response = client.post('/auth/import', headers=headers, json={'users': [
+        {'email': 'New3@Example.com', 'password': 'Passw0rd!', 'first_name': 'New', 'last_name': 'Three'},
+        {'email': 'new4@example.com', 'password': 'Passw0rd!', 'first_name': 'New', 'last_name': 'Four',
+         'role': 'owner'}
+    ]})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert (result['imported'], result['failed']) == (1, 1)
+    assert result['errors'] == [{'row': 1, 'email': 'new4@example.com', 'error': 'Invalid role'}]
+    assert User.query.filter_by(email='new3@example.com').one().check_password('Passw0rd!')
+
+
+def test_import_refuses_a_malformed_body(client, seed, login):
+    headers = login('admin@example.com')
+
+    for body, content_type in (('{"users": [', 'application/json'),
+                               ('{"users": "everyone"}', 'application/json'),
+                               ('first_name,last_name\nNo,Email\n', 'text/csv')):
+        response = client.post('/auth/import', data=body, content_type=content_type, headers=headers)
+        assert response.status_code == 400, body
+        assert 'error' in response.get_json()
+    assert User.query.count() == 5
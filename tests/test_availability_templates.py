@@ -0,0 +1,51 @@
+from datetime import time
+from flask import g
+from app import db
+from app.models import Availability
+from app.utils.availability_templates import TEMPLATE_VERSION_KEY
+from app.utils.conflict_index import bump_schedule_version
+
+
+def test_booking_sees_hours_another_worker_removed(client, seed, login, booking_day):
+    provider_id = seed.provider_ids[0]
+    availability = Availability(provider_id=provider_id, day_of_week=booking_day.weekday(),
+                                start_time=time(8), end_time=time(18), is_available=True)
+    db.session.add(availability)
+    db.session.commit()
+
+    # Cache the provider's template in this worker
+    slots = client.get(
+        f'/appointments/available-slots?service_id={seed.service_id}&date={booking_day}&provider_id={provider_id}'
+    ).get_json()['slots']
+    assert any(slot['start_time'] == f'{booking_day}T14:00:00' and slot['available'] for slot in slots)
+
+    # Another worker cuts the day short; this worker's cache is never told directly
+    availability.end_time = time(12)
+    bump_schedule_version(*TEMPLATE_VERSION_KEY)
+    db.session.commit()
+    # A server gives each request its own app context; here requests share the test's
+    g.pop('availability_version', None)
+
+    response = client.post('/appointments/', headers=login('customer@example.com'), json={
+        'service_id': seed.service_id,
+        'vehicle_id': seed.vehicle_id,
+        'provider_id': provider_id,
+        'start_time': f'{booking_day}T14:00:00'
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Provider is not available at this time'
+
+
+def test_availability_change_applies_at_once(client, seed, login, booking_day):
+    headers = login('provider0@example.com')
+    day_of_week = booking_day.weekday()
+    url = f'/appointments/available-slots?service_id={seed.service_id}&date={booking_day}&provider_id={seed.provider_ids[0]}'
+
+    client.post('/providers/availability', headers=headers,
+                json={'day_of_week': day_of_week, 'start_time': '08:00', 'end_time': '18:00'})
+    assert len(client.get(url).get_json()['slots']) > 0
+    response = client.post('/providers/availability', headers=headers,
+                           json={'day_of_week': day_of_week, 'start_time': '08:00', 'end_time': '18:00',
+                                 'is_available': False})
+    assert response.status_code == 200
+    assert not any(slot['available'] for slot in client.get(url).get_json()['slots'])
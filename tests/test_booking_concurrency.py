@@ -0,0 +1,60 @@
+import threading
+from collections import Counter
+import pytest
+from app import db
+from app.models import Appointment
+
+PARALLEL_BOOKINGS = 100
+
+
+def race_for_slot(app, headers, payload):
+    """Fire PARALLEL_BOOKINGS requests for the same slot at once; returns their status codes"""
+    barrier = threading.Barrier(PARALLEL_BOOKINGS)
+    statuses = []
+
+    def book():
+        client = app.test_client()
+        barrier.wait()
+        response = client.post('/appointments/', json=payload, headers=headers)
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=book) for _ in range(PARALLEL_BOOKINGS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return Counter(statuses)
+
+
+def test_parallel_bookings_for_one_provider_slot_have_one_winner(app, seed, login, booking_day):
+    headers = login('customer@example.com')
+    payload = {
+        'service_id': seed.service_id,
+        'vehicle_id': seed.vehicle_id,
+        'provider_id': seed.provider_ids[0],
+        'start_time': f'{booking_day}T10:00:00'
+    }
+
+    statuses = race_for_slot(app, headers, payload)
+
+    assert statuses == Counter({201: 1, 409: PARALLEL_BOOKINGS - 1})
+    db.session.remove()
+    assert Appointment.query.filter_by(provider_id=seed.provider_ids[0]).count() == 1
+
+
+def test_parallel_unassigned_bookings_fill_the_shop_pool_exactly(app, seed, login, booking_day):
+    headers = login('customer@example.com')
+    payload = {
+        'service_id': seed.service_id,
+        'vehicle_id': seed.vehicle_id,
+        'start_time': f'{booking_day}T10:00:00'
+    }
+
+    statuses = race_for_slot(app, headers, payload)
+
+    # One booking per provider, each assigned to a different one
+    providers = len(seed.provider_ids)
+    assert statuses == Counter({201: providers, 409: PARALLEL_BOOKINGS - providers})
+    db.session.remove()
+    assigned = [appointment.provider_id for appointment in Appointment.query.all()]
+    assert sorted(assigned) == sorted(seed.provider_ids)
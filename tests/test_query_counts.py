@@ -0,0 +1,65 @@
+from datetime import datetime, time, timedelta
+import pytest
+from app import db
+from app.models import Appointment
+from app.utils import revocation
+
+ROW_COUNTS = (5, 50, 120)
+
+# Statements per request: the page and the four relation loads for a list
+# (plus the ownership check for a vehicle's); one joined query for a
+# detail; a fixed handful for a slot range
+EXPECTED_QUERIES = {'list': 5, 'vehicle': 6, 'detail': 1, 'range': 5}
+
+
+def add_appointments(seed, booking_day, count):
+    """Spread `count` confirmed appointments over the providers and the next few days"""
+    for n in range(count):
+        start = datetime.combine(booking_day + timedelta(days=n // 40), time(8)) + timedelta(minutes=15 * (n % 40))
+        db.session.add(Appointment(
+            customer_id=seed.customer_id,
+            provider_id=seed.provider_ids[n % 3],
+            service_id=seed.service_id,
+            vehicle_id=seed.vehicle_id,
+            start_time=start,
+            end_time=start + timedelta(minutes=15),
+            status='confirmed'
+        ))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.mark.parametrize('rows', ROW_COUNTS)
+def test_query_counts_do_not_grow_with_rows(client, seed, login, booking_day, query_counter, monkeypatch, rows):
+    # Keep the periodic revocation sync out of the counts
+    monkeypatch.setattr(revocation, '_next_sync', float('inf'))
+    admin = login('admin@example.com')
+    customer = login('customer@example.com')
+    add_appointments(seed, booking_day, rows)
+    counts = {}
+
+    with query_counter() as count:
+        response = client.get('/appointments/?limit=200', headers=admin)
+    assert len(response.get_json()['appointments']) == rows
+    counts['list'] = count.value
+
+    with query_counter() as count:
+        response = client.get(f'/vehicles/{seed.vehicle_id}/appointments', headers=customer)
+    assert response.get_json()['total_appointments'] == rows
+    counts['vehicle'] = count.value
+
+    with query_counter() as count:
+        response = client.get('/appointments/1', headers=admin)
+    assert response.get_json()['appointment']['service']['name'] == 'Oil change'
+    counts['detail'] = count.value
+
+    with query_counter() as count:
+        response = client.get(
+            f'/appointments/available-slots/range?service_id={seed.service_id}'
+            f'&start_date={booking_day}&end_date={booking_day + timedelta(days=6)}'
+        )
+        assert response.status_code == 200
+        response.get_data()
+    counts['range'] = count.value
+
+    assert counts == EXPECTED_QUERIES
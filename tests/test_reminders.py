@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import Appointment
+from app.utils import reminders, transports
+from app.utils.rate_limit import TokenBucket
+
+
+class FailingTransport(transports.FakeTransport):
+    def _deliver(self, to, subject, body, timeout):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def unpaced_sms(monkeypatch):
+    monkeypatch.setattr(reminders, '_sms_bucket', TokenBucket(1000, 1000))
+
+
+@pytest.fixture
+def due_appointments(seed):
+    """Three confirmed appointments starting within the reminder window"""
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(hours=2)
+    for offset in range(3):
+        db.session.add(Appointment(
+            customer_id=seed.customer_id,
+            provider_id=seed.provider_ids[offset],
+            service_id=seed.service_id,
+            vehicle_id=seed.vehicle_id,
+            start_time=start,
+            end_time=start + timedelta(minutes=45),
+            status='confirmed'
+        ))
+    db.session.commit()
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Record each send_due_reminders() result, stopping a runaway loop"""
+    results = []
+    send_due_reminders = reminders.send_due_reminders
+
+    def counting(hours_ahead=None, batch_size=None):
+        if len(results) >= 10:
+            raise RuntimeError('reminder loop did not stop')
+        results.append(send_due_reminders(hours_ahead, batch_size))
+        return results[-1]
+
+    monkeypatch.setattr(reminders, 'send_due_reminders', counting)
+    return results
+
+
+def test_remind_once_drains_full_batches_that_deliver(app, due_appointments, batches, monkeypatch):
+    monkeypatch.setitem(transports._transports, 'email', transports.FakeTransport())
+    monkeypatch.setitem(transports._transports, 'sms', transports.FakeTransport())
+
+    result = app.test_cli_runner().invoke(args=['notifications', 'remind', '--once', '--batch-size', '1'])
+
+    assert result.exit_code == 0, result.output
+    assert [claimed for claimed, _, _ in batches] == [1, 1, 1, 0]
+    assert Appointment.query.filter(Appointment.reminder_sent_at.is_(None)).count() == 0
+
+
+def test_remind_once_stops_when_nothing_is_delivered(app, due_appointments, batches, monkeypatch):
+    monkeypatch.setitem(transports._transports, 'email', FailingTransport())
+    monkeypatch.setitem(transports._transports, 'sms', FailingTransport())
+
+    result = app.test_cli_runner().invoke(args=['notifications', 'remind', '--once', '--batch-size', '1'])
+
+    assert result.exit_code == 0, result.output
+    assert batches == [(1, 0, 0)]
+    # Released for the next run
+    assert Appointment.query.filter(Appointment.reminder_sent_at.is_(None)).count() == 3
@@ -0,0 +1,89 @@
+from datetime import time, timedelta
+from app import db
+from app.models import Appointment, Availability, User
+
+
+def take_provider_off_the_day(seed, booking_day):
+    """Leave two providers, the second of whom only works the following weekday"""
+    db.session.delete(User.query.get(seed.provider_ids[0]))
+    db.session.add(Availability(
+        provider_id=seed.provider_ids[2],
+        day_of_week=(booking_day.weekday() + 1) % 5,
+        start_time=time(8),
+        end_time=time(18),
+        is_available=True
+    ))
+    db.session.commit()
+
+
+def slot_available(client, seed, booking_day, start):
+    response = client.get(
+        f'/appointments/available-slots?service_id={seed.service_id}&date={booking_day}'
+    )
+    assert response.status_code == 200
+    return next(
+        slot['available'] for slot in response.get_json()['slots']
+        if slot['start_time'] == f'{booking_day}T{start}'
+    )
+
+
+def test_providers_off_that_day_do_not_count_towards_capacity(client, seed, login, booking_day):
+    take_provider_off_the_day(seed, booking_day)
+    headers = login('customer@example.com')
+    booking = {'service_id': seed.service_id, 'vehicle_id': seed.vehicle_id}
+
+    response = client.post('/appointments/', json={
+        **booking, 'provider_id': seed.provider_ids[1], 'start_time': f'{booking_day}T10:00:00'
+    }, headers=headers)
+    assert response.status_code == 201
+
+    # The only provider working that day is taken at 10:00
+    assert slot_available(client, seed, booking_day, '10:00:00') is False
+    assert slot_available(client, seed, booking_day, '12:00:00') is True
+
+    response = client.post('/appointments/', json={
+        **booking, 'start_time': f'{booking_day}T10:00:00'
+    }, headers=headers)
+    assert response.status_code == 409
+    assert Appointment.query.filter(Appointment.provider_id.is_(None)).count() == 0
+
+    response = client.post('/appointments/', json={
+        **booking, 'start_time': f'{booking_day}T12:00:00'
+    }, headers=headers)
+    assert response.status_code == 201
+    assert response.get_json()['appointment']['provider_id'] == seed.provider_ids[1]
+
+
+def test_unassigned_booking_nobody_can_take_is_refused(client, seed, login, booking_day):
+    headers = login('customer@example.com')
+    booking = {'service_id': seed.service_id, 'vehicle_id': seed.vehicle_id}
+    first, second = seed.provider_ids[1], seed.provider_ids[2]
+    db.session.delete(User.query.get(seed.provider_ids[0]))
+    db.session.commit()
+
+    # Never more than one booking at a time, yet neither provider is free 10:00-10:45
+    for provider_id, start in ((first, '09:30:00'), (second, '10:30:00')):
+        response = client.post('/appointments/', json={
+            **booking, 'provider_id': provider_id, 'start_time': f'{booking_day}T{start}'
+        }, headers=headers)
+        assert response.status_code == 201
+
+    response = client.post('/appointments/', json={
+        **booking, 'start_time': f'{booking_day}T10:00:00'
+    }, headers=headers)
+    assert response.status_code == 409
+    assert Appointment.query.filter(Appointment.provider_id.is_(None)).count() == 0
+
+
+def test_weekend_days_have_no_slots(client, seed, booking_day):
+    saturday = booking_day + timedelta(days=5 - booking_day.weekday())
+    query = f'service_id={seed.service_id}'
+    for provider in ('', f'&provider_id={seed.provider_ids[0]}'):
+        single = client.get(f'/appointments/available-slots?{query}&date={saturday}{provider}')
+        assert single.status_code == 200
+        assert single.get_json()['slots'] == []
+
+        days = client.get(
+            f'/appointments/available-slots/range?{query}&start_date={saturday}&end_date={saturday}{provider}'
+        ).get_json()
+        assert days['days'][0]['slots'] == []
@@ -0,0 +1,41 @@
+import time
+from app import socketio
+from config import Config
+
+
+def received_deltas(socket_client):
+    return [message['args'][0] for message in socket_client.get_received() if message['name'] == 'slots_delta']
+
+
+def test_provider_room_pushes_the_service_slots_the_api_serves(app, client, seed, login, booking_day):
+    provider_id = seed.provider_ids[0]
+    watcher = socketio.test_client(app)
+    watcher.emit('subscribe_slots', {'service_id': seed.service_id, 'provider_id': provider_id, 'date': str(booking_day)})
+
+    response = client.post('/appointments/', headers=login('customer@example.com'), json={
+        'service_id': seed.service_id,
+        'vehicle_id': seed.vehicle_id,
+        'provider_id': provider_id,
+        'start_time': f'{booking_day}T10:00:00'
+    })
+    assert response.status_code == 201
+    time.sleep(Config.SLOT_PUSH_DEBOUNCE_SECONDS + 0.5)
+
+    deltas = received_deltas(watcher)
+    assert len(deltas) == 1
+    assert deltas[0]['service_id'] == seed.service_id
+    assert deltas[0]['provider_id'] == provider_id
+
+    slots = client.get(
+        f'/appointments/available-slots?service_id={seed.service_id}&date={booking_day}&provider_id={provider_id}'
+    ).get_json()
+    assert deltas[0]['version'] == slots['version']
+    assert {change['start_time']: change['available'] for change in deltas[0]['changes']} == {
+        slot['start_time']: slot['available'] for slot in slots['slots']
+    }
+
+
+def test_slot_subscriptions_need_a_service(app, booking_day):
+    watcher = socketio.test_client(app)
+    watcher.emit('subscribe_slots', {'provider_id': 1, 'date': str(booking_day)})
+    assert watcher.get_received()[-1]['name'] == 'subscription_error'
@@ -0,0 +1,52 @@
+from app import socketio
+
+
+def token_of(headers):
+    return headers['Authorization'].split(' ', 1)[1]
+
+
+def book(client, seed, login, booking_day):
+    response = client.post('/appointments/', headers=login('customer@example.com'), json={
+        'service_id': seed.service_id,
+        'vehicle_id': seed.vehicle_id,
+        'provider_id': seed.provider_ids[0],
+        'start_time': f'{booking_day}T10:00:00'
+    })
+    assert response.status_code == 201
+
+
+def events(socket_client):
+    return [message['name'] for message in socket_client.get_received()]
+
+
+def test_only_the_provider_or_an_admin_receives_provider_bookings(app, client, seed, login, booking_day):
+    provider_id = seed.provider_ids[0]
+    anonymous = socketio.test_client(app)
+    other_provider = socketio.test_client(app, auth={'token': token_of(login('provider1@example.com'))})
+    provider = socketio.test_client(app, auth={'token': token_of(login('provider0@example.com'))})
+    admin = socketio.test_client(app, auth={'token': token_of(login('admin@example.com'))})
+
+    for socket_client in (anonymous, other_provider, admin):
+        socket_client.emit('join_provider_room', {'provider_id': provider_id})
+    assert events(anonymous)[-1] == 'room_error'
+    assert events(other_provider)[-1] == 'room_error'
+    assert events(admin)[-1] == 'room_joined'
+    events(provider)
+
+    book(client, seed, login, booking_day)
+
+    # The provider joined its room on connect
+    assert 'new_appointment' in events(provider)
+    assert 'new_appointment' in events(admin)
+    assert 'new_appointment' not in events(anonymous)
+    assert 'new_appointment' not in events(other_provider)
+
+
+def test_token_in_the_query_string_is_ignored(app, seed, login):
+    token = token_of(login('customer@example.com'))
+
+    from_query = socketio.test_client(app, query_string=f'token={token}')
+    from_auth = socketio.test_client(app, auth={'token': token})
+
+    assert from_query.get_received()[0]['args'][0]['user_id'] is None
+    assert from_auth.get_received()[0]['args'][0]['user_id'] is not None
@@ -0,0 +1,57 @@
+import smtplib
+import socket
+import pytest
+from app.utils.transports import SmtpTransport
+
+
+class FakeSmtpConnection:
+    """Stands in for smtplib.SMTP; `failure` is raised by send_message"""
+
+    def __init__(self, failure=None):
+        self.sock = socket.socket()
+        self.failure = failure
+        self.sent = []
+
+    def send_message(self, message):
+        if self.failure:
+            raise self.failure
+        self.sent.append(message['To'])
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+        self.sock = None
+
+
+class PooledSmtpTransport(SmtpTransport):
+    """Hands out prepared connections instead of dialing a server"""
+
+    def __init__(self, *connections):
+        super().__init__('smtp.example.com', 587, False, None, None, 'shop@example.com', pool_size=1)
+        self.connections = list(connections)
+
+    def _connect(self, timeout):
+        return self.connections.pop(0)
+
+
+def test_idle_connection_closed_by_the_server_is_replaced():
+    stale, fresh = FakeSmtpConnection(), FakeSmtpConnection()
+    transport = PooledSmtpTransport(stale, fresh)
+    assert transport.send('a@example.com', 'Hi', '<p>Hi</p>')
+    stale.close()  # smtplib does this when it sees the server hang up
+
+    assert transport.send('b@example.com', 'Hi', '<p>Hi</p>')
+    assert (stale.sent, fresh.sent) == (['a@example.com'], ['b@example.com'])
+
+
+def test_dropped_connection_is_retried_once_and_failures_are_closed():
+    first = FakeSmtpConnection()
+    retry = FakeSmtpConnection(failure=smtplib.SMTPServerDisconnected('gone'))
+    transport = PooledSmtpTransport(first, retry)
+    assert transport.send('a@example.com', 'Hi', '<p>Hi</p>')
+    first.failure = ConnectionResetError()
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        transport.send('b@example.com', 'Hi', '<p>Hi</p>')
+    assert first.sock is None and retry.sock is None
+    assert transport._idle.empty()
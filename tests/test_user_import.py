@@ -0,0 +1,41 @@
+import json
+from eventlet import tpool
+from app.controllers import auth_controller
+from app.models import User
+from app.utils import passwords
+from app.utils.validators import validate_email
+from config import Config
+
+
+def test_cli_process_hashes_inline(app):
+    # The test process, like the CLI, is never monkey patched
+    assert passwords._green_runtime() is None
+
+
+def test_cli_imports_across_chunks_under_eventlet(app, monkeypatch, tmp_path):
+    # A patched process hands each hash to the hub's thread pool; run them inline here
+    offloaded = []
+    monkeypatch.setattr(passwords, '_green_runtime', lambda: 'eventlet')
+    monkeypatch.setattr(tpool, 'execute', lambda func, *args: offloaded.append(func) or func(*args))
+    monkeypatch.setattr(Config, 'USER_IMPORT_MAX_ROWS', 4)
+    # No DNS here; check the format only
+    monkeypatch.setattr(auth_controller, 'validate_email',
+                        lambda email, check_deliverability=True: validate_email(email, check_deliverability=False))
+
+    rows = [
+        {'email': f'user{i}@example.com', 'password': 'Passw0rd!', 'first_name': 'Imported', 'last_name': str(i)}
+        for i in range(10)
+    ]
+    rows[5]['password'] = 'short'
+    path = tmp_path / 'users.json'
+    path.write_text(json.dumps(rows))
+
+    result = app.test_cli_runner().invoke(args=['auth', 'import-users', str(path)])
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 9 users, 1 rows failed' in result.output
+    assert 'Row 6: user5@example.com' in result.output
+    assert User.query.filter(User.last_name != '5').count() == 9
+    assert User.query.get(1).check_password('Passw0rd!')
+    # Nine hashes plus the check above
+    assert len(offloaded) == 10